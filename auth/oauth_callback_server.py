@@ -18,7 +18,7 @@ from fastapi.responses import FileResponse, JSONResponse
 from typing import Optional
 from urllib.parse import urlparse
 
-from auth.scopes import SCOPES, get_current_scopes  # noqa
+from auth.scopes import get_current_scopes  # noqa
 from auth.oauth_responses import (
     create_error_response,
     create_success_response,
@@ -404,12 +404,17 @@ def get_oauth_config() -> OAuthConfig:
     """
     Get the global OAuth configuration instance.
 
-    Thread-safe singleton accessor.
+    Thread-safe singleton accessor. Once the instance exists it is returned
+    without taking the lock, since the convenience helpers below call this on
+    every check.
 
     Returns:
         The singleton OAuth configuration instance
     """
     global _oauth_config
+    config = _oauth_config
+    if config is not None:
+        return config
     with _oauth_config_lock:
         if _oauth_config is None:
             _oauth_config = OAuthConfig()
@@ -5,6 +5,7 @@ This module centralizes OAuth scope definitions for Google Workspace integration
 Separated from service_decorator.py to avoid circular imports.
 """
 
+import functools
 import logging
 
 logger = logging.getLogger(__name__)
@@ -85,27 +86,42 @@ SCRIPT_METRICS_SCOPE = "https://www.googleapis.com/auth/script.metrics"
 # See https://developers.google.com/gmail/api/auth/scopes,
 # https://developers.google.com/drive/api/guides/api-specific-auth, etc.
 SCOPE_HIERARCHY = {
-    GMAIL_MODIFY_SCOPE: {
-        GMAIL_READONLY_SCOPE,
-        GMAIL_SEND_SCOPE,
-        GMAIL_COMPOSE_SCOPE,
-        GMAIL_LABELS_SCOPE,
-    },
-    DRIVE_SCOPE: {DRIVE_READONLY_SCOPE, DRIVE_FILE_SCOPE},
-    CALENDAR_SCOPE: {CALENDAR_READONLY_SCOPE, CALENDAR_EVENTS_SCOPE},
-    DOCS_WRITE_SCOPE: {DOCS_READONLY_SCOPE},
-    SHEETS_WRITE_SCOPE: {SHEETS_READONLY_SCOPE},
-    SLIDES_SCOPE: {SLIDES_READONLY_SCOPE},
-    TASKS_SCOPE: {TASKS_READONLY_SCOPE},
-    CONTACTS_SCOPE: {CONTACTS_READONLY_SCOPE},
-    CHAT_WRITE_SCOPE: {CHAT_READONLY_SCOPE},
-    CHAT_SPACES_SCOPE: {CHAT_SPACES_READONLY_SCOPE},
-    FORMS_BODY_SCOPE: {FORMS_BODY_READONLY_SCOPE},
-    SCRIPT_PROJECTS_SCOPE: {SCRIPT_PROJECTS_READONLY_SCOPE},
-    SCRIPT_DEPLOYMENTS_SCOPE: {SCRIPT_DEPLOYMENTS_READONLY_SCOPE},
+    GMAIL_MODIFY_SCOPE: frozenset(
+        (
+            GMAIL_READONLY_SCOPE,
+            GMAIL_SEND_SCOPE,
+            GMAIL_COMPOSE_SCOPE,
+            GMAIL_LABELS_SCOPE,
+        )
+    ),
+    DRIVE_SCOPE: frozenset((DRIVE_READONLY_SCOPE, DRIVE_FILE_SCOPE)),
+    CALENDAR_SCOPE: frozenset((CALENDAR_READONLY_SCOPE, CALENDAR_EVENTS_SCOPE)),
+    DOCS_WRITE_SCOPE: frozenset((DOCS_READONLY_SCOPE,)),
+    SHEETS_WRITE_SCOPE: frozenset((SHEETS_READONLY_SCOPE,)),
+    SLIDES_SCOPE: frozenset((SLIDES_READONLY_SCOPE,)),
+    TASKS_SCOPE: frozenset((TASKS_READONLY_SCOPE,)),
+    CONTACTS_SCOPE: frozenset((CONTACTS_READONLY_SCOPE,)),
+    CHAT_WRITE_SCOPE: frozenset((CHAT_READONLY_SCOPE,)),
+    CHAT_SPACES_SCOPE: frozenset((CHAT_SPACES_READONLY_SCOPE,)),
+    FORMS_BODY_SCOPE: frozenset((FORMS_BODY_READONLY_SCOPE,)),
+    SCRIPT_PROJECTS_SCOPE: frozenset((SCRIPT_PROJECTS_READONLY_SCOPE,)),
+    SCRIPT_DEPLOYMENTS_SCOPE: frozenset((SCRIPT_DEPLOYMENTS_READONLY_SCOPE,)),
 }
 
 
+def _build_covered_by(hierarchy):
+    """Invert a scope hierarchy into narrow scope -> broad scopes covering it."""
+    covered_by = {}
+    for broad_scope, covered in hierarchy.items():
+        for narrow_scope in covered:
+            covered_by.setdefault(narrow_scope, set()).add(broad_scope)
+    return {scope: frozenset(broad) for scope, broad in covered_by.items()}
+
+
+# Reverse index of SCOPE_HIERARCHY, built once at import
+_COVERED_BY = _build_covered_by(SCOPE_HIERARCHY)
+
+
 def has_required_scopes(available_scopes, required_scopes):
     """
     Check if available scopes satisfy all required scopes, accounting for
@@ -113,23 +129,30 @@ def has_required_scopes(available_scopes, required_scopes):
 
     Args:
         available_scopes: Scopes the credentials have (set, list, or frozenset).
-        required_scopes: Scopes that are required (set, list, or frozenset).
+        required_scopes: Scopes that are required (any iterable).
 
     Returns:
         True if all required scopes are satisfied.
     """
-    available = set(available_scopes or [])
-    required = set(required_scopes or [])
-    # Expand available scopes with implied narrower scopes
-    expanded = set(available)
-    for broad_scope, covered in SCOPE_HIERARCHY.items():
-        if broad_scope in available:
-            expanded.update(covered)
-    return all(scope in expanded for scope in required)
+    if isinstance(available_scopes, (set, frozenset)):
+        available = available_scopes
+    else:
+        available = frozenset(available_scopes or ())
+    # Materialized once: it is iterated twice below (and may be a generator)
+    required = frozenset(required_scopes or ())
+    # Common case: every required scope was granted verbatim
+    if available.issuperset(required):
+        return True
+    return all(
+        scope in available
+        or not _COVERED_BY.get(scope, frozenset()).isdisjoint(available)
+        for scope in required
+    )
 
 
 # Base OAuth scopes required for user identification
 BASE_SCOPES = [USERINFO_EMAIL_SCOPE, USERINFO_PROFILE_SCOPE, OPENID_SCOPE]
+BASE_SCOPES_FS = frozenset(BASE_SCOPES)
 
 # Service-specific scope groups
 DOCS_SCOPES = [
@@ -187,42 +210,47 @@ SCRIPT_SCOPES = [
 
 # Tool-to-scopes mapping
 TOOL_SCOPES_MAP = {
-    "gmail": GMAIL_SCOPES,
-    "drive": DRIVE_SCOPES,
-    "calendar": CALENDAR_SCOPES,
-    "docs": DOCS_SCOPES,
-    "sheets": SHEETS_SCOPES,
-    "chat": CHAT_SCOPES,
-    "forms": FORMS_SCOPES,
-    "slides": SLIDES_SCOPES,
-    "tasks": TASKS_SCOPES,
-    "contacts": CONTACTS_SCOPES,
-    "search": CUSTOM_SEARCH_SCOPES,
-    "appscript": SCRIPT_SCOPES,
+    "gmail": frozenset(GMAIL_SCOPES),
+    "drive": frozenset(DRIVE_SCOPES),
+    "calendar": frozenset(CALENDAR_SCOPES),
+    "docs": frozenset(DOCS_SCOPES),
+    "sheets": frozenset(SHEETS_SCOPES),
+    "chat": frozenset(CHAT_SCOPES),
+    "forms": frozenset(FORMS_SCOPES),
+    "slides": frozenset(SLIDES_SCOPES),
+    "tasks": frozenset(TASKS_SCOPES),
+    "contacts": frozenset(CONTACTS_SCOPES),
+    "search": frozenset(CUSTOM_SEARCH_SCOPES),
+    "appscript": frozenset(SCRIPT_SCOPES),
 }
 
 # Tool-to-read-only-scopes mapping
 TOOL_READONLY_SCOPES_MAP = {
-    "gmail": [GMAIL_READONLY_SCOPE],
-    "drive": [DRIVE_READONLY_SCOPE],
-    "calendar": [CALENDAR_READONLY_SCOPE],
-    "docs": [DOCS_READONLY_SCOPE, DRIVE_READONLY_SCOPE],
-    "sheets": [SHEETS_READONLY_SCOPE, DRIVE_READONLY_SCOPE],
-    "chat": [CHAT_READONLY_SCOPE, CHAT_SPACES_READONLY_SCOPE],
-    "forms": [FORMS_BODY_READONLY_SCOPE, FORMS_RESPONSES_READONLY_SCOPE],
-    "slides": [SLIDES_READONLY_SCOPE],
-    "tasks": [TASKS_READONLY_SCOPE],
-    "contacts": [CONTACTS_READONLY_SCOPE],
-    "search": CUSTOM_SEARCH_SCOPES,
-    "appscript": [
-        SCRIPT_PROJECTS_READONLY_SCOPE,
-        SCRIPT_DEPLOYMENTS_READONLY_SCOPE,
-        SCRIPT_PROCESSES_READONLY_SCOPE,
-        SCRIPT_METRICS_SCOPE,
-        DRIVE_READONLY_SCOPE,
-    ],
+    "gmail": frozenset((GMAIL_READONLY_SCOPE,)),
+    "drive": frozenset((DRIVE_READONLY_SCOPE,)),
+    "calendar": frozenset((CALENDAR_READONLY_SCOPE,)),
+    "docs": frozenset((DOCS_READONLY_SCOPE, DRIVE_READONLY_SCOPE)),
+    "sheets": frozenset((SHEETS_READONLY_SCOPE, DRIVE_READONLY_SCOPE)),
+    "chat": frozenset((CHAT_READONLY_SCOPE, CHAT_SPACES_READONLY_SCOPE)),
+    "forms": frozenset((FORMS_BODY_READONLY_SCOPE, FORMS_RESPONSES_READONLY_SCOPE)),
+    "slides": frozenset((SLIDES_READONLY_SCOPE,)),
+    "tasks": frozenset((TASKS_READONLY_SCOPE,)),
+    "contacts": frozenset((CONTACTS_READONLY_SCOPE,)),
+    "search": frozenset(CUSTOM_SEARCH_SCOPES),
+    "appscript": frozenset(
+        (
+            SCRIPT_PROJECTS_READONLY_SCOPE,
+            SCRIPT_DEPLOYMENTS_READONLY_SCOPE,
+            SCRIPT_PROCESSES_READONLY_SCOPE,
+            SCRIPT_METRICS_SCOPE,
+            DRIVE_READONLY_SCOPE,
+        )
+    ),
 }
 
+# Union of every read-only scope plus base scopes (the maps above are constant)
+_ALL_READONLY_SCOPES = BASE_SCOPES_FS.union(*TOOL_READONLY_SCOPES_MAP.values())
+
 
 def set_enabled_tools(enabled_tools):
     """
@@ -259,10 +287,7 @@ def is_read_only_mode() -> bool:
 
 def get_all_read_only_scopes() -> list[str]:
     """Get all possible read-only scopes across all tools."""
-    all_scopes = set(BASE_SCOPES)
-    for scopes in TOOL_READONLY_SCOPES_MAP.values():
-        all_scopes.update(scopes)
-    return list(all_scopes)
+    return list(_ALL_READONLY_SCOPES)
 
 
 def get_current_scopes():
@@ -293,19 +318,18 @@ def get_scopes_for_tools(enabled_tools=None):
     """
     # Granular permissions mode overrides both full and read-only scope maps.
     # Lazy import with guard to avoid circular dependency during module init
-    # (SCOPES = get_scopes_for_tools() runs at import time before auth.permissions
-    # is fully loaded, but permissions mode is never active at that point).
+    # (auth.permissions imports this module, and permissions mode is never
+    # active before both modules are fully loaded).
     try:
         from auth.permissions import is_permissions_mode, get_all_permission_scopes
 
         if is_permissions_mode():
-            scopes = BASE_SCOPES.copy()
-            scopes.extend(get_all_permission_scopes())
+            scopes = BASE_SCOPES_FS.union(get_all_permission_scopes())
             logger.debug(
                 "Generated scopes from granular permissions: %d unique scopes",
-                len(set(scopes)),
+                len(scopes),
             )
-            return list(set(scopes))
+            return list(scopes)
     except ImportError:
         pass
 
@@ -313,24 +337,35 @@ def get_scopes_for_tools(enabled_tools=None):
         # Default behavior - return all scopes
         enabled_tools = TOOL_SCOPES_MAP.keys()
 
-    # Start with base scopes (always required)
-    scopes = BASE_SCOPES.copy()
+    return list(_get_scopes_cached(frozenset(enabled_tools), _READ_ONLY_MODE))
 
+
+@functools.lru_cache(maxsize=8)
+def _get_scopes_cached(enabled_tools: frozenset, read_only: bool) -> tuple[str, ...]:
+    """Build the unique scope set for a tool selection and mode (memoized)."""
     # Determine which map to use based on read-only mode
-    scope_map = TOOL_READONLY_SCOPES_MAP if _READ_ONLY_MODE else TOOL_SCOPES_MAP
-    mode_str = "read-only" if _READ_ONLY_MODE else "full"
+    scope_map = TOOL_READONLY_SCOPES_MAP if read_only else TOOL_SCOPES_MAP
+    mode_str = "read-only" if read_only else "full"
 
-    # Add scopes for each enabled tool
-    for tool in enabled_tools:
-        if tool in scope_map:
-            scopes.extend(scope_map[tool])
+    # Base scopes are always required; union in each enabled tool's scopes
+    scopes = BASE_SCOPES_FS.union(
+        *[scope_map[tool] for tool in enabled_tools if tool in scope_map]
+    )
 
     logger.debug(
-        f"Generated {mode_str} scopes for tools {list(enabled_tools)}: {len(set(scopes))} unique scopes"
+        f"Generated {mode_str} scopes for tools {sorted(enabled_tools)}: {len(scopes)} unique scopes"
     )
-    # Return unique scopes
-    return list(set(scopes))
+    return tuple(scopes)
 
 
-# Combined scopes for all supported Google Workspace operations (backwards compatibility)
-SCOPES = get_scopes_for_tools()
+def __getattr__(name):
+    """
+    Resolve SCOPES lazily (PEP 562).
+
+    SCOPES holds the combined scopes for the currently enabled tools
+    (backwards compatibility). Computing it on access rather than at import
+    keeps it consistent with set_enabled_tools() and set_read_only().
+    """
+    if name == "SCOPES":
+        return get_scopes_for_tools(_ENABLED_TOOLS)
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
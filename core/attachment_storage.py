@@ -6,11 +6,18 @@ Files are automatically cleaned up after expiration (default 1 hour).
 """
 
 import base64
+import binascii
+import heapq
 import logging
 import os
-import uuid
+import secrets
+import shutil
+import tempfile
+import time
+from dataclasses import dataclass
 from pathlib import Path
-from typing import NamedTuple, Optional, Dict
+from threading import RLock
+from typing import Callable, NamedTuple, Optional, Dict, List, Tuple
 from datetime import datetime, timedelta
 
 logger = logging.getLogger(__name__)
@@ -26,24 +33,162 @@ STORAGE_DIR = (
 )
 
 
-def _ensure_storage_dir() -> None:
-    """Create the storage directory on first use, not at import time."""
+# Basic mime type to extension mapping for attachments saved without a filename
+_MIME_TO_EXT: Dict[str, str] = {
+    "image/jpeg": ".jpg",
+    "image/png": ".png",
+    "image/gif": ".gif",
+    "application/pdf": ".pdf",
+    "application/zip": ".zip",
+    "text/plain": ".txt",
+    "text/html": ".html",
+}
+
+# Base64 characters decoded per chunk when streaming to disk (multiple of 4)
+_DECODE_CHUNK_CHARS = 64 * 1024
+
+
+# Directory already created by _ensure_storage_dir (and its str form), to skip
+# repeat mkdir calls and Path -> str conversions
+_storage_dir_ready: Optional[Path] = None
+_storage_dir_str = ""
+
+
+def _ensure_storage_dir() -> str:
+    """
+    Create the storage directory on first use, not at import time.
+
+    Returns:
+        The storage directory as a string path.
+    """
+    global _storage_dir_ready, _storage_dir_str
+    if _storage_dir_ready == STORAGE_DIR:
+        return _storage_dir_str
     STORAGE_DIR.mkdir(parents=True, exist_ok=True, mode=0o700)
+    _storage_dir_ready = STORAGE_DIR
+    _storage_dir_str = str(STORAGE_DIR)
+    return _storage_dir_str
+
+
+def _forget_storage_dir() -> None:
+    """Force the next _ensure_storage_dir call to re-create the directory."""
+    global _storage_dir_ready
+    _storage_dir_ready = None
+
+
+def _open_storage_file(file_path: str) -> int:
+    """
+    Open a new private file in the storage directory for writing.
+
+    If the directory was removed after it was cached as ready (e.g. by a tmp
+    cleaner), it is re-created and the open retried once.
+    """
+    flags = os.O_WRONLY | os.O_CREAT | os.O_TRUNC | getattr(os, "O_BINARY", 0)
+    try:
+        return os.open(file_path, flags, 0o600)
+    except FileNotFoundError:
+        _forget_storage_dir()
+        _ensure_storage_dir()
+        return os.open(file_path, flags, 0o600)
+
+
+def _write_all(fd: int, data: bytes) -> int:
+    """Write all of data to fd, looping over short writes."""
+    # Regular-file writes normally complete in one call; only retry on a short
+    # write, slicing a memoryview so the remainder is not copied.
+    data_len = len(data)
+    total_written = os.write(fd, data)
+    if total_written == data_len:
+        return total_written
+    view = memoryview(data)
+    while total_written < data_len:
+        written = os.write(fd, view[total_written:])
+        if written == 0:
+            raise OSError("os.write returned 0 bytes; could not write attachment data")
+        total_written += written
+    return total_written
+
+
+def _write_base64(fd: int, base64_data: str) -> int:
+    """
+    Decode URL-safe base64 data to fd chunk by chunk.
+
+    Only one decoded chunk is held in memory at a time. Input that does not
+    split cleanly on 4-character boundaries (e.g. embedded CR/LF) falls back
+    to decoding the whole payload at once.
+
+    Raises:
+        binascii.Error: If the data is not valid base64.
+    """
+    data_len = len(base64_data)
+    if data_len <= _DECODE_CHUNK_CHARS:
+        return _write_all(fd, base64.urlsafe_b64decode(base64_data))
+
+    total_written = 0
+    try:
+        for start in range(0, data_len, _DECODE_CHUNK_CHARS):
+            end = start + _DECODE_CHUNK_CHARS
+            chunk = base64_data[start:end]
+            if end < data_len and "=" in chunk:
+                raise binascii.Error("Padding before end of data")
+            total_written += _write_all(fd, base64.urlsafe_b64decode(chunk))
+        return total_written
+    except binascii.Error:
+        os.lseek(fd, 0, os.SEEK_SET)
+        os.ftruncate(fd, 0)
+        return _write_all(fd, base64.urlsafe_b64decode(base64_data))
+
+
+def _storage_name(
+    file_id: str, filename: Optional[str], mime_type: Optional[str]
+) -> Tuple[str, str]:
+    """
+    Return (file name on disk, extension) for a new attachment.
+
+    Uses the original filename if available, with an ID suffix for uniqueness;
+    otherwise derives the extension from the mime type.
+    """
+    if filename:
+        stem, extension = os.path.splitext(os.path.basename(filename))
+        return f"{stem}_{file_id[:8]}{extension}", extension
+    extension = _MIME_TO_EXT.get(mime_type, "") if mime_type else ""
+    return f"{file_id}{extension}", extension
 
 
 class SavedAttachment(NamedTuple):
-    """Result of saving an attachment: provides both the UUID and the absolute file path."""
+    """Result of saving an attachment: provides both the file ID and the absolute file path."""
 
     file_id: str
     path: str
 
 
+@dataclass(slots=True)
+class AttachmentRecord:
+    """Metadata tracked for a stored attachment."""
+
+    file_path: str
+    filename: str
+    mime_type: str
+    size: int
+    created_at: datetime
+    # Wall-clock expiry reported to callers
+    expires_at: datetime
+    # time.monotonic() deadline used for expiry checks, immune to wall-clock
+    # adjustments; meaningless outside this process, so never exported
+    deadline: float
+
+
 class AttachmentStorage:
     """Manages temporary storage of email attachments."""
 
     def __init__(self, expiration_seconds: int = DEFAULT_EXPIRATION_SECONDS):
         self.expiration_seconds = expiration_seconds
-        self._metadata: Dict[str, Dict] = {}
+        self._metadata: Dict[str, AttachmentRecord] = {}
+        # Min-heap of (deadline, file_id); entries for files that were already
+        # removed are skipped lazily when popped.
+        self._expiry_heap: List[Tuple[float, str]] = []
+        # Guards _metadata and _expiry_heap; file I/O happens outside the lock
+        self._lock = RLock()
 
     def save_attachment(
         self,
@@ -60,90 +205,170 @@ class AttachmentStorage:
             mime_type: MIME type (optional)
 
         Returns:
-            SavedAttachment with file_id (UUID) and path (absolute file path)
+            SavedAttachment with file_id (random hex ID) and path (absolute file path)
         """
-        _ensure_storage_dir()
+        return self._save(
+            lambda fd: _write_base64(fd, base64_data), filename, mime_type
+        )
 
-        # Generate unique file ID for metadata tracking
-        file_id = str(uuid.uuid4())
+    def save_attachment_bytes(
+        self,
+        data: bytes,
+        filename: Optional[str] = None,
+        mime_type: Optional[str] = None,
+    ) -> SavedAttachment:
+        """
+        Save raw attachment bytes to local disk, skipping the base64 round-trip.
 
-        # Decode base64 data
-        try:
-            file_bytes = base64.urlsafe_b64decode(base64_data)
-        except Exception as e:
-            logger.error(f"Failed to decode base64 attachment data: {e}")
-            raise ValueError(f"Invalid base64 data: {e}")
+        Args:
+            data: Attachment content
+            filename: Original filename (optional)
+            mime_type: MIME type (optional)
 
-        # Determine file extension from filename or mime type
-        extension = ""
-        if filename:
-            extension = Path(filename).suffix
-        elif mime_type:
-            # Basic mime type to extension mapping
-            mime_to_ext = {
-                "image/jpeg": ".jpg",
-                "image/png": ".png",
-                "image/gif": ".gif",
-                "application/pdf": ".pdf",
-                "application/zip": ".zip",
-                "text/plain": ".txt",
-                "text/html": ".html",
-            }
-            extension = mime_to_ext.get(mime_type, "")
-
-        # Use original filename if available, with UUID suffix for uniqueness
-        if filename:
-            stem = Path(filename).stem
-            ext = Path(filename).suffix
-            save_name = f"{stem}_{file_id[:8]}{ext}"
-        else:
-            save_name = f"{file_id}{extension}"
+        Returns:
+            SavedAttachment with file_id (random hex ID) and path (absolute file path)
+        """
+        return self._save(lambda fd: _write_all(fd, data), filename, mime_type)
+
+    def _save(
+        self,
+        write: Callable[[int], int],
+        filename: Optional[str],
+        mime_type: Optional[str],
+    ) -> SavedAttachment:
+        """Create a new storage file, fill it with write(fd) and register it."""
+        storage_dir = _ensure_storage_dir()
+
+        # Generate unique file ID for metadata tracking
+        file_id = secrets.token_hex(16)
+
+        save_name, extension = _storage_name(file_id, filename, mime_type)
 
         # Save file with restrictive permissions (sensitive email/drive content)
-        file_path = STORAGE_DIR / save_name
+        file_path = os.path.join(storage_dir, save_name)
         try:
-            fd = os.open(
-                file_path,
-                os.O_WRONLY | os.O_CREAT | os.O_TRUNC | getattr(os, "O_BINARY", 0),
-                0o600,
-            )
+            fd = _open_storage_file(file_path)
             try:
-                total_written = 0
-                data_len = len(file_bytes)
-                while total_written < data_len:
-                    written = os.write(fd, file_bytes[total_written:])
-                    if written == 0:
-                        raise OSError(
-                            "os.write returned 0 bytes; could not write attachment data"
-                        )
-                    total_written += written
+                total_written = write(fd)
             finally:
                 os.close(fd)
             logger.info(
                 f"Saved attachment file_id={file_id} filename={filename or save_name} "
-                f"({len(file_bytes)} bytes) to {file_path}"
+                f"({total_written} bytes) to {file_path}"
             )
+        except (ValueError, TypeError) as e:
+            # ValueError covers binascii.Error and non-ASCII str input
+            logger.error(f"Failed to decode base64 attachment data: {e}")
+            try:
+                os.unlink(file_path)
+            except OSError:
+                pass
+            raise ValueError(f"Invalid base64 data: {e}")
         except Exception as e:
+            if isinstance(e, OSError):
+                # The directory may have been removed; re-check on the next save
+                _forget_storage_dir()
             logger.error(
                 f"Failed to save attachment file_id={file_id} "
                 f"filename={filename or save_name} to {file_path}: {e}"
             )
             raise
 
-        # Store metadata
-        expires_at = datetime.now() + timedelta(seconds=self.expiration_seconds)
-        self._metadata[file_id] = {
-            "file_path": str(file_path),
-            "filename": filename or f"attachment{extension}",
-            "mime_type": mime_type or "application/octet-stream",
-            "size": len(file_bytes),
-            "created_at": datetime.now(),
-            "expires_at": expires_at,
-        }
+        self._register(
+            file_id, file_path, filename, mime_type, extension, total_written
+        )
+        return SavedAttachment(file_id=file_id, path=file_path)
+
+    def create_temp_file(self) -> Tuple[int, str]:
+        """
+        Create an empty, private temporary file inside the storage directory.
+
+        Callers stream data into it and hand it to save_attachment_from_path,
+        which can then rename it into place without copying.
+
+        Returns:
+            (open file descriptor, absolute path) as from tempfile.mkstemp
+        """
+        try:
+            return tempfile.mkstemp(
+                prefix=".download-", suffix=".part", dir=_ensure_storage_dir()
+            )
+        except FileNotFoundError:
+            # The cached directory was removed externally; re-create it once
+            _forget_storage_dir()
+            return tempfile.mkstemp(
+                prefix=".download-", suffix=".part", dir=_ensure_storage_dir()
+            )
+
+    def save_attachment_from_path(
+        self,
+        source_path: str,
+        filename: Optional[str] = None,
+        mime_type: Optional[str] = None,
+    ) -> SavedAttachment:
+        """
+        Move an already-written file into storage.
+
+        The file is renamed into place when it is on the same filesystem (e.g.
+        from create_temp_file), so large downloads are never re-read or decoded.
+
+        Args:
+            source_path: Path of the file to take ownership of
+            filename: Original filename (optional)
+            mime_type: MIME type (optional)
+
+        Returns:
+            SavedAttachment with file_id (random hex ID) and path (absolute file path)
+        """
+        storage_dir = _ensure_storage_dir()
+        file_id = secrets.token_hex(16)
+        save_name, extension = _storage_name(file_id, filename, mime_type)
+        file_path = os.path.join(storage_dir, save_name)
+        try:
+            os.chmod(source_path, 0o600)
+            shutil.move(source_path, file_path)
+            size = os.path.getsize(file_path)
+        except OSError as e:
+            _forget_storage_dir()
+            logger.error(
+                f"Failed to store attachment file_id={file_id} "
+                f"filename={filename or save_name} from {source_path}: {e}"
+            )
+            raise
+        logger.info(
+            f"Saved attachment file_id={file_id} filename={filename or save_name} "
+            f"({size} bytes) to {file_path}"
+        )
 
-        return SavedAttachment(file_id=file_id, path=str(file_path))
+        self._register(file_id, file_path, filename, mime_type, extension, size)
+        return SavedAttachment(file_id=file_id, path=file_path)
 
-    def get_attachment_path(self, file_id: str) -> Optional[Path]:
+    def _register(
+        self,
+        file_id: str,
+        file_path: str,
+        filename: Optional[str],
+        mime_type: Optional[str],
+        extension: str,
+        size: int,
+    ) -> None:
+        """Record metadata for a stored file and schedule its expiry."""
+        deadline = time.monotonic() + self.expiration_seconds
+        created_at = datetime.now()
+        record = AttachmentRecord(
+            file_path=file_path,
+            filename=filename or f"attachment{extension}",
+            mime_type=mime_type or "application/octet-stream",
+            size=size,
+            created_at=created_at,
+            expires_at=created_at + timedelta(seconds=self.expiration_seconds),
+            deadline=deadline,
+        )
+        with self._lock:
+            self._metadata[file_id] = record
+            heapq.heappush(self._expiry_heap, (deadline, file_id))
+
+    def get_attachment_path(self, file_id: str) -> Optional[str]:
         """
         Get the file path for an attachment ID.
 
@@ -151,25 +376,26 @@ class AttachmentStorage:
             file_id: Unique file ID
 
         Returns:
-            Path object if file exists and not expired, None otherwise
+            Absolute file path if file exists and not expired, None otherwise
         """
-        if file_id not in self._metadata:
+        with self._lock:
+            record = self._metadata.get(file_id)
+        if record is None:
             logger.warning(f"Attachment {file_id} not found in metadata")
             return None
 
-        metadata = self._metadata[file_id]
-        file_path = Path(metadata["file_path"])
-
         # Check if expired
-        if datetime.now() > metadata["expires_at"]:
+        if time.monotonic() > record.deadline:
             logger.info(f"Attachment {file_id} has expired, cleaning up")
             self._cleanup_file(file_id)
             return None
 
         # Check if file exists
-        if not file_path.exists():
+        file_path = record.file_path
+        if not os.path.exists(file_path):
             logger.warning(f"Attachment file {file_path} does not exist")
-            del self._metadata[file_id]
+            with self._lock:
+                self._metadata.pop(file_id, None)
             return None
 
         return file_path
@@ -184,29 +410,43 @@ class AttachmentStorage:
         Returns:
             Metadata dict if exists and not expired, None otherwise
         """
-        if file_id not in self._metadata:
+        with self._lock:
+            record = self._metadata.get(file_id)
+        if record is None:
             return None
 
-        metadata = self._metadata[file_id].copy()
-
         # Check if expired
-        if datetime.now() > metadata["expires_at"]:
+        if time.monotonic() > record.deadline:
             self._cleanup_file(file_id)
             return None
 
-        return metadata
+        return {
+            "file_path": record.file_path,
+            "filename": record.filename,
+            "mime_type": record.mime_type,
+            "size": record.size,
+            "created_at": record.created_at,
+            "expires_at": record.expires_at,
+        }
 
     def _cleanup_file(self, file_id: str) -> None:
         """Remove file and metadata."""
-        if file_id in self._metadata:
-            file_path = Path(self._metadata[file_id]["file_path"])
-            try:
-                if file_path.exists():
-                    file_path.unlink()
-                    logger.debug(f"Deleted expired attachment file: {file_path}")
-            except Exception as e:
-                logger.warning(f"Failed to delete attachment file {file_path}: {e}")
-            del self._metadata[file_id]
+        with self._lock:
+            record = self._metadata.pop(file_id, None)
+        if record is not None:
+            self._delete_record_file(record)
+
+    @staticmethod
+    def _delete_record_file(record: AttachmentRecord) -> None:
+        """Delete the on-disk file backing a record."""
+        file_path = record.file_path
+        try:
+            os.unlink(file_path)
+            logger.debug(f"Deleted expired attachment file: {file_path}")
+        except FileNotFoundError:
+            pass
+        except OSError as e:
+            logger.warning(f"Failed to delete attachment file {file_path}: {e}")
 
     def cleanup_expired(self) -> int:
         """
@@ -215,17 +455,21 @@ class AttachmentStorage:
         Returns:
             Number of files cleaned up
         """
-        now = datetime.now()
-        expired_ids = [
-            file_id
-            for file_id, metadata in self._metadata.items()
-            if now > metadata["expires_at"]
-        ]
-
-        for file_id in expired_ids:
-            self._cleanup_file(file_id)
-
-        return len(expired_ids)
+        now = time.monotonic()
+        expired: List[AttachmentRecord] = []
+        with self._lock:
+            heap = self._expiry_heap
+            while heap and heap[0][0] < now:
+                _, file_id = heapq.heappop(heap)
+                record = self._metadata.get(file_id)
+                if record is not None and now > record.deadline:
+                    del self._metadata[file_id]
+                    expired.append(record)
+
+        for record in expired:
+            self._delete_record_file(record)
+
+        return len(expired)
 
 
 # Global instance
@@ -2,7 +2,8 @@ import asyncio
 import hashlib
 import logging
 import os
-from typing import List, Optional
+from contextlib import asynccontextmanager
+from typing import Awaitable, Callable, List, Optional
 from importlib import metadata
 
 from fastapi.responses import HTMLResponse, JSONResponse, FileResponse
@@ -25,7 +26,7 @@ from auth.oauth_responses import (
     create_server_error_response,
 )
 from auth.auth_info_middleware import AuthInfoMiddleware
-from auth.scopes import BASE_SCOPES, SCOPES, get_current_scopes  # noqa
+from auth.scopes import BASE_SCOPES, get_current_scopes  # noqa
 from core.config import (
     USER_GOOGLE_EMAIL,
     get_transport_mode,
@@ -153,10 +154,35 @@ if USER_GOOGLE_EMAIL:
 When using Google Workspace tools, always use `{USER_GOOGLE_EMAIL}` as the `user_google_email` parameter. Do not ask the user for their email address."""
     logger.info(f"Server instructions configured for user: {USER_GOOGLE_EMAIL}")
 
+# Async cleanup callbacks run when the server shuts down (see register_shutdown_callback)
+_shutdown_callbacks: List[Callable[[], Awaitable[None]]] = []
+
+
+def register_shutdown_callback(
+    callback: Callable[[], Awaitable[None]],
+) -> Callable[[], Awaitable[None]]:
+    """Register an async callback to run on the server's event loop at shutdown."""
+    _shutdown_callbacks.append(callback)
+    return callback
+
+
+@asynccontextmanager
+async def _server_lifespan(_server):
+    try:
+        yield {}
+    finally:
+        for callback in _shutdown_callbacks:
+            try:
+                await callback()
+            except Exception as e:
+                logger.warning(f"Shutdown callback {callback.__name__} failed: {e}")
+
+
 server = SecureFastMCP(
     name="google_workspace",
     auth=None,
     instructions=_server_instructions,
+    lifespan=_server_lifespan,
 )
 
 # Add the AuthInfo middleware to inject authentication into FastMCP context
@@ -3,19 +3,20 @@ import io
 import json
 import logging
 import os
+import re
 import zipfile
 import ssl
 import asyncio
 import functools
 
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
-from typing import Annotated, Any, List, Optional
+from typing import IO, Annotated, Any, Callable, Dict, Iterator, List, Optional, Tuple
 
 from pydantic import BeforeValidator
 from defusedxml import ElementTree as ET
 
 from googleapiclient.errors import HttpError
-from .api_enablement import get_api_enablement_message
 from auth.google_auth import GoogleAuthenticationError
 from auth.oauth_config import is_oauth21_enabled, is_external_oauth21_provider
 
@@ -97,26 +98,167 @@ that send ``'{"key":"val"}'`` instead of ``{"key": "val"}``.
 _ALLOWED_FILE_DIRS_ENV = "ALLOWED_FILE_DIRS"
 
 
+# Allowed dirs resolved for a given (ALLOWED_FILE_DIRS, home) pair. Resolving
+# costs stat/readlink syscalls per path component, so only redo it when the
+# inputs change.
+# Each dir is stored alongside its (str, str-with-trailing-separator) form so
+# containment checks are plain string comparisons.
+_allowed_dirs_cache: Optional[
+    tuple[tuple[Optional[str], str], tuple[Path, ...], tuple[tuple[str, str], ...]]
+] = None
+
+
+# Directories under the user's home that commonly contain credentials/keys
+_SENSITIVE_DIRS: tuple[str, ...] = (
+    ".ssh",
+    ".aws",
+    ".kube",
+    ".gnupg",
+    ".config/gcloud",
+)
+
+# Blocked home sub-directories for a given home path, both as written and
+# resolved (so a symlinked home or ~/.ssh is still covered), as
+# (dir, dir + separator) string pairs
+_sensitive_home_dirs_cache: Optional[tuple[str, tuple[tuple[str, str], ...]]] = None
+
+
+def _invalidate_path_caches() -> None:
+    """Drop cached path data used by validate_file_path (for tests)."""
+    global _allowed_dirs_cache, _sensitive_home_dirs_cache
+    _allowed_dirs_cache = None
+    _sensitive_home_dirs_cache = None
+
+
+def _dir_prefix_pair(path: Path) -> tuple[str, str]:
+    """Return (path, path + separator) strings for prefix containment checks."""
+    path_str = str(path)
+    return path_str, path_str if path_str.endswith(os.sep) else path_str + os.sep
+
+
+def _get_sensitive_home_dirs() -> tuple[tuple[str, str], ...]:
+    """Return the home sub-directories that validate_file_path always blocks."""
+    global _sensitive_home_dirs_cache
+    home_str = os.path.expanduser("~")
+    cached = _sensitive_home_dirs_cache
+    if cached is not None and cached[0] == home_str:
+        return cached[1]
+
+    home = Path.home()
+    blocked: list[tuple[str, str]] = []
+    for sensitive_dir in _SENSITIVE_DIRS:
+        path = home / sensitive_dir
+        for candidate in (path, path.resolve()):
+            pair = _dir_prefix_pair(candidate)
+            if pair not in blocked:
+                blocked.append(pair)
+    _sensitive_home_dirs_cache = (home_str, tuple(blocked))
+    return _sensitive_home_dirs_cache[1]
+
+
 def _get_allowed_file_dirs() -> list[Path]:
     """Return the list of directories from which local file access is permitted."""
+    return list(_load_allowed_file_dirs()[1])
+
+
+def _get_allowed_dir_prefixes() -> tuple[tuple[str, str], ...]:
+    """Return (dir, dir + separator) string pairs for the allowed directories."""
+    return _load_allowed_file_dirs()[2]
+
+
+def _load_allowed_file_dirs():
+    """Return the cache entry for the current ALLOWED_FILE_DIRS and home."""
+    global _allowed_dirs_cache
     env_val = os.environ.get(_ALLOWED_FILE_DIRS_ENV)
+    cache_key = (env_val, os.path.expanduser("~"))
+    cached = _allowed_dirs_cache
+    if cached is not None and cached[0] == cache_key:
+        return cached
+
     if env_val:
-        return [
+        dirs = [
             Path(p).expanduser().resolve()
             for p in env_val.split(os.pathsep)
             if p.strip()
         ]
-    home = Path.home()
-    return [home] if home else []
+    else:
+        home = Path.home()
+        dirs = [home] if home else []
+
+    prefixes = tuple(_dir_prefix_pair(d) for d in dirs)
+    _allowed_dirs_cache = (cache_key, tuple(dirs), prefixes)
+    return _allowed_dirs_cache
+
+
+# Well-known sensitive system paths (including macOS /private variants), matched
+# as whole path components by a single compiled regex
+_SENSITIVE_PREFIXES: tuple[str, ...] = (
+    "/proc",
+    "/sys",
+    "/dev",
+    "/etc/shadow",
+    "/etc/passwd",
+    "/private/etc/shadow",
+    "/private/etc/passwd",
+)
+_SENSITIVE_PREFIX_RE = re.compile(
+    "(?:" + "|".join(map(re.escape, _SENSITIVE_PREFIXES)) + r")(?:/|\Z)"
+)
+
+# Credential/secret file names blocked regardless of allowlist (lower-case)
+_SENSITIVE_NAMES: frozenset[str] = frozenset(
+    {
+        ".credentials",
+        ".credentials.json",
+        "credentials.json",
+        "client_secret.json",
+        "client_secrets.json",
+        "service_account.json",
+        "service-account.json",
+        ".npmrc",
+        ".pypirc",
+        ".netrc",
+        ".git-credentials",
+        ".docker/config.json",
+    }
+)
+
+
+def _reject_sensitive_path(path_str: str) -> None:
+    """Raise ValueError if path_str names a sensitive file or system location."""
+    file_name = os.path.basename(path_str).lower()
+
+    # Block .env files and variants (.env, .env.local, .env.production, etc.)
+    if file_name == ".env" or file_name.startswith(".env."):
+        raise ValueError(
+            f"Access to '{path_str}' is not allowed: "
+            ".env files may contain secrets and cannot be read, uploaded, or attached."
+        )
+
+    # Block well-known sensitive system paths (including macOS /private variants)
+    if _SENSITIVE_PREFIX_RE.match(path_str):
+        raise ValueError(
+            f"Access to '{path_str}' is not allowed: "
+            "path is in a restricted system location."
+        )
+
+    # Block other credential/secret file patterns
+    if file_name in _SENSITIVE_NAMES:
+        raise ValueError(
+            f"Access to '{path_str}' is not allowed: "
+            "this file commonly contains secrets or credentials."
+        )
 
 
 def validate_file_path(file_path: str) -> Path:
     """
     Validate that a file path is safe to read from the server filesystem.
 
-    Resolves the path canonically (following symlinks), then verifies it falls
-    within one of the allowed base directories. Rejects paths to sensitive
-    system locations regardless of allowlist.
+    Cheap name and prefix checks run on the normalized path first, so obvious
+    rejections cost no filesystem access. The path is then resolved canonically
+    (following symlinks) and re-checked, and must fall within one of the
+    allowed base directories. Rejects paths to sensitive system locations
+    regardless of allowlist.
 
     Args:
         file_path: The raw file path string to validate.
@@ -125,101 +267,63 @@ def validate_file_path(file_path: str) -> Path:
         Path: The resolved, validated Path object.
 
     Raises:
-        ValueError: If the path is outside allowed directories or targets
-                    a sensitive location.
+        FileNotFoundError: If the path does not exist.
+        ValueError: If the path is outside allowed directories, targets
+                    a sensitive location, or cannot be resolved.
     """
-    resolved = Path(file_path).resolve()
+    normalized = os.path.abspath(os.path.expanduser(file_path))
+    _reject_sensitive_path(normalized)
 
-    if not resolved.exists():
-        raise FileNotFoundError(f"Path does not exist: {resolved}")
-
-    # Block sensitive file patterns regardless of allowlist
-    resolved_str = str(resolved)
-    file_name = resolved.name.lower()
-
-    # Block .env files and variants (.env, .env.local, .env.production, etc.)
-    if file_name == ".env" or file_name.startswith(".env."):
+    # realpath(strict=True) resolves and checks existence in one pass; the
+    # checks below work on the string and only the result becomes a Path
+    try:
+        resolved_str = os.path.realpath(normalized, strict=True)
+    except (FileNotFoundError, NotADirectoryError):
+        raise FileNotFoundError(f"Path does not exist: {normalized}")
+    except OSError as e:
+        # Permission denied, symlink loops, etc. keep the ValueError contract
         raise ValueError(
-            f"Access to '{resolved_str}' is not allowed: "
-            ".env files may contain secrets and cannot be read, uploaded, or attached."
-        )
+            f"Access to '{normalized}' is not allowed: path could not be resolved "
+            f"({e.strerror or e})."
+        ) from e
 
-    # Block well-known sensitive system paths (including macOS /private variants)
-    sensitive_prefixes = (
-        "/proc",
-        "/sys",
-        "/dev",
-        "/etc/shadow",
-        "/etc/passwd",
-        "/private/etc/shadow",
-        "/private/etc/passwd",
-    )
-    for prefix in sensitive_prefixes:
-        if resolved_str == prefix or resolved_str.startswith(prefix + "/"):
-            raise ValueError(
-                f"Access to '{resolved_str}' is not allowed: "
-                "path is in a restricted system location."
-            )
+    # Symlinks may point somewhere the normalized path did not reveal
+    if resolved_str != normalized:
+        _reject_sensitive_path(resolved_str)
 
     # Block sensitive directories that commonly contain credentials/keys
-    sensitive_dirs = (
-        ".ssh",
-        ".aws",
-        ".kube",
-        ".gnupg",
-        ".config/gcloud",
-    )
-    for sensitive_dir in sensitive_dirs:
-        home = Path.home()
-        blocked = home / sensitive_dir
-        if resolved == blocked or str(resolved).startswith(str(blocked) + "/"):
+    for blocked_str, blocked_prefix in _get_sensitive_home_dirs():
+        if resolved_str == blocked_str or resolved_str.startswith(blocked_prefix):
             raise ValueError(
                 f"Access to '{resolved_str}' is not allowed: "
                 "path is in a directory that commonly contains secrets or credentials."
             )
 
-    # Block other credential/secret file patterns
-    sensitive_names = {
-        ".credentials",
-        ".credentials.json",
-        "credentials.json",
-        "client_secret.json",
-        "client_secrets.json",
-        "service_account.json",
-        "service-account.json",
-        ".npmrc",
-        ".pypirc",
-        ".netrc",
-        ".git-credentials",
-        ".docker/config.json",
-    }
-    if file_name in sensitive_names:
-        raise ValueError(
-            f"Access to '{resolved_str}' is not allowed: "
-            "this file commonly contains secrets or credentials."
-        )
-
-    allowed_dirs = _get_allowed_file_dirs()
-    if not allowed_dirs:
+    allowed_prefixes = _get_allowed_dir_prefixes()
+    if not allowed_prefixes:
         raise ValueError(
             "No allowed file directories configured. "
             "Set the ALLOWED_FILE_DIRS environment variable or ensure a home directory exists."
         )
 
-    for allowed in allowed_dirs:
-        try:
-            resolved.relative_to(allowed)
-            return resolved
-        except ValueError:
-            continue
+    for allowed_str, allowed_prefix in allowed_prefixes:
+        if resolved_str == allowed_str or resolved_str.startswith(allowed_prefix):
+            return Path(resolved_str)
 
     raise ValueError(
         f"Access to '{resolved_str}' is not allowed: "
-        f"path is outside permitted directories ({', '.join(str(d) for d in allowed_dirs)}). "
+        f"path is outside permitted directories ({', '.join(d for d, _ in allowed_prefixes)}). "
         "Set ALLOWED_FILE_DIRS to adjust."
     )
 
 
+def _probe_directory_writable(directory: str) -> None:
+    """Create and remove a probe file in directory, raising OSError on failure."""
+    test_file = os.path.join(directory, ".permission_test")
+    os.close(os.open(test_file, os.O_CREAT | os.O_WRONLY | os.O_TRUNC, 0o600))
+    os.unlink(test_file)
+
+
 def check_credentials_directory_permissions(credentials_dir: str = None) -> None:
     """
     Check if the service has appropriate permissions to create and write to the .credentials directory.
@@ -237,14 +341,12 @@ def check_credentials_directory_permissions(credentials_dir: str = None) -> None
         credentials_dir = get_default_credentials_dir()
 
     try:
-        # Check if directory exists
-        if os.path.exists(credentials_dir):
-            # Directory exists, check if we can write to it
-            test_file = os.path.join(credentials_dir, ".permission_test")
+        if os.path.isdir(credentials_dir):
+            # Directory exists; access() answers with a single syscall, and the
+            # write probe only runs when it reports the directory unwritable
             try:
-                with open(test_file, "w") as f:
-                    f.write("test")
-                os.remove(test_file)
+                if not os.access(credentials_dir, os.W_OK | os.X_OK):
+                    _probe_directory_writable(credentials_dir)
                 logger.info(
                     f"Credentials directory permissions check passed: {os.path.abspath(credentials_dir)}"
                 )
@@ -257,10 +359,7 @@ def check_credentials_directory_permissions(credentials_dir: str = None) -> None
             try:
                 os.makedirs(credentials_dir, exist_ok=True)
                 # Test writing to the new directory
-                test_file = os.path.join(credentials_dir, ".permission_test")
-                with open(test_file, "w") as f:
-                    f.write("test")
-                os.remove(test_file)
+                _probe_directory_writable(credentials_dir)
                 logger.info(
                     f"Created credentials directory with proper permissions: {os.path.abspath(credentials_dir)}"
                 )
@@ -283,133 +382,209 @@ def check_credentials_directory_permissions(credentials_dir: str = None) -> None
         )
 
 
+# Clark-notation tags for SpreadsheetML, precomputed so element lookups can use
+# the C-level Element.iter()/find() instead of compiling ElementPath expressions
+_NS_EXCEL_MAIN = "http://schemas.openxmlformats.org/spreadsheetml/2006/main"
+_EXCEL_SI_TAG = f"{{{_NS_EXCEL_MAIN}}}si"
+_EXCEL_T_TAG = f"{{{_NS_EXCEL_MAIN}}}t"
+_EXCEL_C_TAG = f"{{{_NS_EXCEL_MAIN}}}c"
+_EXCEL_V_TAG = f"{{{_NS_EXCEL_MAIN}}}v"
+_EXCEL_ROW_TAG = f"{{{_NS_EXCEL_MAIN}}}row"
+
+# Text-run tags scraped from Word and PowerPoint parts: <w:t> (WordprocessingML),
+# <a:t> (DrawingML, used by slides and shapes) and <m:t> (Office Math), in both
+# the transitional and strict OOXML namespaces
+_OFFICE_TEXT_TAGS = frozenset(
+    f"{{{ns}}}t"
+    for ns in (
+        "http://schemas.openxmlformats.org/wordprocessingml/2006/main",
+        "http://schemas.openxmlformats.org/drawingml/2006/main",
+        "http://schemas.openxmlformats.org/officeDocument/2006/math",
+        "http://purl.oclc.org/ooxml/wordprocessingml/main",
+        "http://purl.oclc.org/ooxml/drawingml/main",
+        "http://purl.oclc.org/ooxml/officeDocument/math",
+    )
+)
+
+_XLSX_MIME_TYPE = "application/vnd.openxmlformats-officedocument.spreadsheetml.sheet"
+
+# Slide and worksheet parts inside PPTX/XLSX packages (excludes _rels/ and
+# drawing parts, which live in sub-directories or other folders)
+_PPTX_SLIDE_RE = re.compile(r"ppt/slides/slide[^/]+\.xml\Z")
+_XLSX_WORKSHEET_RE = re.compile(r"xl/worksheets/sheet[^/]+\.xml\Z")
+
+# Read-ahead for zip members handed to iterparse. ZipExtFile inflates in small
+# steps; a larger buffer cuts the number of decompress calls on big parts.
+_OFFICE_XML_READ_BUFFER = 64 * 1024
+
+
+# Upper bound on threads used to extract slides/worksheets concurrently
+_OFFICE_XML_MAX_WORKERS = 8
+
+
+def _open_zip_member(zf: zipfile.ZipFile, name: str) -> io.BufferedReader:
+    """Open a zip member for streaming with a large read buffer."""
+    return io.BufferedReader(zf.open(name), buffer_size=_OFFICE_XML_READ_BUFFER)
+
+
+def _iter_shared_strings(source: IO[bytes]) -> Iterator[str]:
+    """
+    Yield the text of each <si> entry in an Excel sharedStrings.xml stream.
+
+    Each entry is the concatenation of its <t> elements, simple or within <r>
+    runs. Entries are cleared once joined so memory stays flat on big tables.
+    """
+    for _, elem in ET.iterparse(source, events=("end",)):
+        if elem.tag == _EXCEL_SI_TAG:
+            yield "".join(t.text or "" for t in elem.iter(_EXCEL_T_TAG))
+            elem.clear()
+
+
+def _extract_member_text(
+    zf: zipfile.ZipFile,
+    member: str,
+    mime_type: str,
+    shared_strings: List[str],
+) -> Optional[str]:
+    """
+    Extract the text of one Office XML member (document, slide or worksheet).
+
+    Parse failures are logged and yield None so the remaining members are
+    still processed.
+    """
+    is_excel = mime_type == _XLSX_MIME_TYPE
+    try:
+        member_texts: List[str] = []
+
+        # Stream the member through iterparse and clear elements once
+        # handled, so peak memory tracks tree depth, not member size
+        with _open_zip_member(zf, member) as member_file:
+            for _, elem in ET.iterparse(member_file, events=("end",)):
+                tag = elem.tag
+                if is_excel:
+                    if tag == _EXCEL_C_TAG:  # <c> cell fully parsed
+                        value_element = elem.find(_EXCEL_V_TAG)  # Find <v> under <c>
+                        cell_type = elem.get("t")
+                        elem.clear()
+
+                        # Skip if cell has no value element or value element has no text
+                        if value_element is None or value_element.text is None:
+                            continue
+
+                        if cell_type == "s":  # Shared string
+                            try:
+                                ss_idx = int(value_element.text)
+                                if 0 <= ss_idx < len(shared_strings):
+                                    member_texts.append(shared_strings[ss_idx])
+                                else:
+                                    logger.warning(
+                                        f"Invalid shared string index {ss_idx} in {member}. Max index: {len(shared_strings) - 1}"
+                                    )
+                            except ValueError:
+                                logger.warning(
+                                    f"Non-integer shared string index: '{value_element.text}' in {member}."
+                                )
+                        else:  # Direct value (number, boolean, inline string if not 's')
+                            member_texts.append(value_element.text)
+                    elif tag == _EXCEL_ROW_TAG:
+                        elem.clear()
+                else:  # Word or PowerPoint
+                    if tag in _OFFICE_TEXT_TAGS and elem.text:
+                        cleaned_text = elem.text.strip()
+                        if cleaned_text:  # Add only if there's non-whitespace text
+                            member_texts.append(cleaned_text)
+                    elem.clear()
+
+        if member_texts:
+            return " ".join(member_texts)  # Join texts from one member with spaces
+
+    except ET.ParseError as e:
+        logger.warning(
+            f"Could not parse XML in member '{member}' for {mime_type} file: {e}"
+        )
+    except Exception as e:
+        logger.error(
+            f"Error processing member '{member}' for {mime_type}: {e}",
+            exc_info=True,
+        )
+    return None
+
+
+def _read_shared_strings(zf: zipfile.ZipFile) -> List[str]:
+    """Return an Excel workbook's shared string table, or [] if unavailable."""
+    try:
+        # Reading from zf.open inflates incrementally instead of
+        # materialising the whole decompressed part first.
+        with _open_zip_member(zf, "xl/sharedStrings.xml") as shared_strings_file:
+            return list(_iter_shared_strings(shared_strings_file))
+    except KeyError:
+        logger.info("No sharedStrings.xml found in Excel file (this is optional).")
+    except ET.ParseError as e:
+        logger.error(f"Error parsing sharedStrings.xml: {e}")
+    except Exception as e:  # Any other unexpected error during sharedStrings parsing
+        logger.error(
+            f"Unexpected error processing sharedStrings.xml: {e}",
+            exc_info=True,
+        )
+    return []
+
+
+def _docx_parts(zf: zipfile.ZipFile) -> Tuple[List[str], List[str]]:
+    """Word: the main document part; no shared strings."""
+    return ["word/document.xml"], []
+
+
+def _pptx_parts(zf: zipfile.ZipFile) -> Tuple[List[str], List[str]]:
+    """PowerPoint: every slide part, in archive order; no shared strings."""
+    return list(filter(_PPTX_SLIDE_RE.match, zf.namelist())), []
+
+
+def _xlsx_parts(zf: zipfile.ZipFile) -> Tuple[List[str], List[str]]:
+    """Excel: every worksheet part plus the workbook's shared string table."""
+    sheets = list(filter(_XLSX_WORKSHEET_RE.match, zf.namelist()))
+    return sheets, _read_shared_strings(zf)
+
+
+# Map MIME → function returning (XML parts to inspect, shared strings)
+_OFFICE_XML_PART_SELECTORS: Dict[
+    str, Callable[[zipfile.ZipFile], Tuple[List[str], List[str]]]
+] = {
+    "application/vnd.openxmlformats-officedocument.wordprocessingml.document": _docx_parts,
+    "application/vnd.openxmlformats-officedocument.presentationml.presentation": _pptx_parts,
+    _XLSX_MIME_TYPE: _xlsx_parts,
+}
+
+
 def extract_office_xml_text(file_bytes: bytes, mime_type: str) -> Optional[str]:
     """
     Very light-weight XML scraper for Word, Excel, PowerPoint files.
     Returns plain-text if something readable is found, else None.
     Uses zipfile + defusedxml.ElementTree.
     """
-    shared_strings: List[str] = []
-    ns_excel_main = "http://schemas.openxmlformats.org/spreadsheetml/2006/main"
+    select_parts = _OFFICE_XML_PART_SELECTORS.get(mime_type)
+    if select_parts is None:
+        return None
 
     try:
+        # BytesIO shares the buffer of an immutable bytes object instead of
+        # copying it. ZipFile pulls compressed data through read(), which must
+        # return fresh bytes, so a memoryview-backed reader would not save copies.
         with zipfile.ZipFile(io.BytesIO(file_bytes)) as zf:
-            targets: List[str] = []
-            # Map MIME → iterable of XML files to inspect
-            if (
-                mime_type
-                == "application/vnd.openxmlformats-officedocument.wordprocessingml.document"
-            ):
-                targets = ["word/document.xml"]
-            elif (
-                mime_type
-                == "application/vnd.openxmlformats-officedocument.presentationml.presentation"
-            ):
-                targets = [n for n in zf.namelist() if n.startswith("ppt/slides/slide")]
-            elif (
-                mime_type
-                == "application/vnd.openxmlformats-officedocument.spreadsheetml.sheet"
-            ):
-                targets = [
-                    n
-                    for n in zf.namelist()
-                    if n.startswith("xl/worksheets/sheet") and "drawing" not in n
-                ]
-                # Attempt to parse sharedStrings.xml for Excel files
-                try:
-                    shared_strings_xml = zf.read("xl/sharedStrings.xml")
-                    shared_strings_root = ET.fromstring(shared_strings_xml)
-                    for si_element in shared_strings_root.findall(
-                        f"{{{ns_excel_main}}}si"
-                    ):
-                        text_parts = []
-                        # Find all <t> elements, simple or within <r> runs, and concatenate their text
-                        for t_element in si_element.findall(f".//{{{ns_excel_main}}}t"):
-                            if t_element.text:
-                                text_parts.append(t_element.text)
-                        shared_strings.append("".join(text_parts))
-                except KeyError:
-                    logger.info(
-                        "No sharedStrings.xml found in Excel file (this is optional)."
-                    )
-                except ET.ParseError as e:
-                    logger.error(f"Error parsing sharedStrings.xml: {e}")
-                except (
-                    Exception
-                ) as e:  # Catch any other unexpected error during sharedStrings parsing
-                    logger.error(
-                        f"Unexpected error processing sharedStrings.xml: {e}",
-                        exc_info=True,
-                    )
-            else:
-                return None
+            targets, shared_strings = select_parts(zf)
 
-            pieces: List[str] = []
-            for member in targets:
-                try:
-                    xml_content = zf.read(member)
-                    xml_root = ET.fromstring(xml_content)
-                    member_texts: List[str] = []
-
-                    if (
-                        mime_type
-                        == "application/vnd.openxmlformats-officedocument.spreadsheetml.sheet"
-                    ):
-                        for cell_element in xml_root.findall(
-                            f".//{{{ns_excel_main}}}c"
-                        ):  # Find all <c> elements
-                            value_element = cell_element.find(
-                                f"{{{ns_excel_main}}}v"
-                            )  # Find <v> under <c>
-
-                            # Skip if cell has no value element or value element has no text
-                            if value_element is None or value_element.text is None:
-                                continue
-
-                            cell_type = cell_element.get("t")
-                            if cell_type == "s":  # Shared string
-                                try:
-                                    ss_idx = int(value_element.text)
-                                    if 0 <= ss_idx < len(shared_strings):
-                                        member_texts.append(shared_strings[ss_idx])
-                                    else:
-                                        logger.warning(
-                                            f"Invalid shared string index {ss_idx} in {member}. Max index: {len(shared_strings) - 1}"
-                                        )
-                                except ValueError:
-                                    logger.warning(
-                                        f"Non-integer shared string index: '{value_element.text}' in {member}."
-                                    )
-                            else:  # Direct value (number, boolean, inline string if not 's')
-                                member_texts.append(value_element.text)
-                    else:  # Word or PowerPoint
-                        for elem in xml_root.iter():
-                            # For Word: <w:t> where w is "http://schemas.openxmlformats.org/wordprocessingml/2006/main"
-                            # For PowerPoint: <a:t> where a is "http://schemas.openxmlformats.org/drawingml/2006/main"
-                            if (
-                                elem.tag.endswith("}t") and elem.text
-                            ):  # Check for any namespaced tag ending with 't'
-                                cleaned_text = elem.text.strip()
-                                if (
-                                    cleaned_text
-                                ):  # Add only if there's non-whitespace text
-                                    member_texts.append(cleaned_text)
-
-                    if member_texts:
-                        pieces.append(
-                            " ".join(member_texts)
-                        )  # Join texts from one member with spaces
-
-                except ET.ParseError as e:
-                    logger.warning(
-                        f"Could not parse XML in member '{member}' for {mime_type} file: {e}"
-                    )
-                except Exception as e:
-                    logger.error(
-                        f"Error processing member '{member}' for {mime_type}: {e}",
-                        exc_info=True,
-                    )
-                    # continue processing other members
+            # Inflate + parse of separate members is independent; ZipFile
+            # serialises the underlying seeks/reads on its shared handle
+            workers = min(_OFFICE_XML_MAX_WORKERS, len(targets), os.cpu_count() or 1)
+
+            def extract(member: str) -> Optional[str]:
+                return _extract_member_text(zf, member, mime_type, shared_strings)
+
+            if workers > 1:
+                with ThreadPoolExecutor(max_workers=workers) as executor:
+                    results = list(executor.map(extract, targets))
+            else:
+                results = [extract(member) for member in targets]
+            pieces = [text for text in results if text]
 
             if not pieces:  # If no text was extracted at all
                 return None
@@ -489,6 +664,67 @@ def encode_image_content(file_bytes: bytes, mime_type: str) -> str:
     return f"[base64_image:{mime_type}]{encoded}"
 
 
+# Retry policy for handle_http_errors: attempts per call and the base of the
+# exponential backoff (1s, 2s, ...) between them
+_HTTP_MAX_RETRIES = 3
+_HTTP_BASE_RETRY_DELAY = 1
+
+
+def _http_error_message(
+    error: HttpError,
+    tool_name: str,
+    service_type: Optional[str],
+    user_google_email: str,
+) -> str:
+    """Build the user-facing message for a non-retried Google API HttpError."""
+    error_details = str(error)
+
+    # Check if this is an API not enabled error
+    if error.resp.status == 403 and "accessNotConfigured" in error_details:
+        # Only needed on this rare path, so keep it out of the import graph
+        from .api_enablement import get_api_enablement_message
+
+        enablement_msg = get_api_enablement_message(error_details, service_type)
+
+        if enablement_msg:
+            return (
+                f"API error in {tool_name}: {enablement_msg}\n\n"
+                f"User: {user_google_email}"
+            )
+        return (
+            f"API error in {tool_name}: {error}. "
+            f"The required API is not enabled for your project. "
+            f"Please check the Google Cloud Console to enable it."
+        )
+
+    if error.resp.status in (401, 403):
+        # Authentication/authorization errors
+        if is_oauth21_enabled():
+            if is_external_oauth21_provider():
+                auth_hint = (
+                    "LLM: Ask the user to provide a valid OAuth 2.1 "
+                    "bearer token in the Authorization header and retry."
+                )
+            else:
+                auth_hint = (
+                    "LLM: Ask the user to authenticate via their MCP "
+                    "client's OAuth 2.1 flow and retry."
+                )
+        else:
+            auth_hint = (
+                "LLM: Try 'start_google_auth' with the user's email "
+                "and the appropriate service_name."
+            )
+        return (
+            f"API error in {tool_name}: {error}. "
+            f"You might need to re-authenticate for user '{user_google_email}'. "
+            f"{auth_hint}"
+        )
+
+    # Other HTTP errors (400 Bad Request, etc.) - don't suggest re-auth
+    return f"API error in {tool_name}: {error}"
+
+
 def handle_http_errors(
     tool_name: str, is_read_only: bool = False, service_type: Optional[str] = None
 ):
@@ -508,109 +744,66 @@ def handle_http_errors(
         service_type (str): Optional. The Google service type (e.g., 'calendar', 'gmail').
     """
 
+    # Only read-only calls are safe to replay after a dropped connection, so the
+    # last attempt that may retry an SSL error is fixed at decoration time. The
+    # loop itself stays for every tool: expired-token 401s are always retried.
+    last_ssl_retry_attempt = _HTTP_MAX_RETRIES - 2 if is_read_only else -1
+
     def decorator(func):
         @functools.wraps(func)
         async def wrapper(*args, **kwargs):
-            max_retries = 3
-            base_delay = 1
-
-            for attempt in range(max_retries):
+            attempt = 0
+            while True:
                 try:
                     return await func(*args, **kwargs)
                 except ssl.SSLError as e:
-                    if is_read_only and attempt < max_retries - 1:
-                        delay = base_delay * (2**attempt)
-                        logger.warning(
-                            f"SSL error in {tool_name} on attempt {attempt + 1}: {e}. Retrying in {delay} seconds..."
-                        )
-                        await asyncio.sleep(delay)
-                    else:
+                    if attempt > last_ssl_retry_attempt:
                         logger.error(
                             f"SSL error in {tool_name} on final attempt: {e}. Raising exception."
                         )
                         raise TransientNetworkError(
-                            f"A transient SSL error occurred in '{tool_name}' after {max_retries} attempts. "
+                            f"A transient SSL error occurred in '{tool_name}' after {_HTTP_MAX_RETRIES} attempts. "
                             "This is likely a temporary network or certificate issue. Please try again shortly."
                         ) from e
+                    delay = _HTTP_BASE_RETRY_DELAY * (2**attempt)
+                    logger.warning(
+                        f"SSL error in {tool_name} on attempt {attempt + 1}: {e}. Retrying in {delay} seconds..."
+                    )
                 except UserInputError as e:
                     message = f"Input error in {tool_name}: {e}"
                     logger.warning(message)
                     raise e
                 except HttpError as error:
-                    user_google_email = kwargs.get("user_google_email", "N/A")
-                    error_details = str(error)
-
                     # Retry on 401 (expired token) - the retry will re-run
                     # require_google_service which refreshes the token
-                    if error.resp.status == 401 and attempt < max_retries - 1:
-                        delay = base_delay * (2**attempt)
-                        logger.warning(
-                            f"Auth error (401) in {tool_name} on attempt {attempt + 1}: {error}. "
-                            f"Token likely expired mid-request. Retrying in {delay}s..."
+                    if error.resp.status != 401 or attempt >= _HTTP_MAX_RETRIES - 1:
+                        message = _http_error_message(
+                            error,
+                            tool_name,
+                            service_type,
+                            kwargs.get("user_google_email", "N/A"),
                         )
-                        await asyncio.sleep(delay)
-                        continue
-
-                    # Check if this is an API not enabled error
-                    if (
-                        error.resp.status == 403
-                        and "accessNotConfigured" in error_details
-                    ):
-                        enablement_msg = get_api_enablement_message(
-                            error_details, service_type
-                        )
-
-                        if enablement_msg:
-                            message = (
-                                f"API error in {tool_name}: {enablement_msg}\n\n"
-                                f"User: {user_google_email}"
-                            )
-                        else:
-                            message = (
-                                f"API error in {tool_name}: {error}. "
-                                f"The required API is not enabled for your project. "
-                                f"Please check the Google Cloud Console to enable it."
-                            )
-                    elif error.resp.status in [401, 403]:
-                        # Authentication/authorization errors
-                        if is_oauth21_enabled():
-                            if is_external_oauth21_provider():
-                                auth_hint = (
-                                    "LLM: Ask the user to provide a valid OAuth 2.1 "
-                                    "bearer token in the Authorization header and retry."
-                                )
-                            else:
-                                auth_hint = (
-                                    "LLM: Ask the user to authenticate via their MCP "
-                                    "client's OAuth 2.1 flow and retry."
-                                )
-                        else:
-                            auth_hint = (
-                                "LLM: Try 'start_google_auth' with the user's email "
-                                "and the appropriate service_name."
-                            )
-                        message = (
-                            f"API error in {tool_name}: {error}. "
-                            f"You might need to re-authenticate for user '{user_google_email}'. "
-                            f"{auth_hint}"
+                        logger.error(
+                            f"API error in {tool_name}: {error}", exc_info=True
                         )
-                    else:
-                        # Other HTTP errors (400 Bad Request, etc.) - don't suggest re-auth
-                        message = f"API error in {tool_name}: {error}"
-
-                    logger.error(f"API error in {tool_name}: {error}", exc_info=True)
-                    raise Exception(message) from error
-                except TransientNetworkError:
+                        raise Exception(message) from error
+                    delay = _HTTP_BASE_RETRY_DELAY * (2**attempt)
+                    logger.warning(
+                        f"Auth error (401) in {tool_name} on attempt {attempt + 1}: {error}. "
+                        f"Token likely expired mid-request. Retrying in {delay}s..."
+                    )
+                except (TransientNetworkError, GoogleAuthenticationError):
                     # Re-raise without wrapping to preserve the specific error type
                     raise
-                except GoogleAuthenticationError:
-                    # Re-raise authentication errors without wrapping
-                    raise
                 except Exception as e:
                     message = f"An unexpected error occurred in {tool_name}: {e}"
                     logger.exception(message)
                     raise Exception(message) from e
 
+                # Only retryable failures reach here
+                await asyncio.sleep(delay)
+                attempt += 1
+
         # Propagate _required_google_scopes if present (for tool filtering)
         if hasattr(func, "_required_google_scopes"):
             wrapper._required_google_scopes = func._required_google_scopes
@@ -7,34 +7,189 @@ This module provides MCP tools for interacting with Google Chat API.
 import base64
 import logging
 import asyncio
+import atexit
+import functools
+import os
 import ssl
-from typing import Dict, List, Optional
+import time
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, List, Optional, Tuple
 
 import httpx
+from google.auth.transport.requests import Request
 from googleapiclient.errors import HttpError
 
 # Auth & server utilities
+from auth.oauth_config import is_stateless_mode
 from auth.service_decorator import require_google_service, require_multiple_services
-from core.server import server
+from core.attachment_storage import get_attachment_storage, get_attachment_url
+from core.config import get_transport_mode
+from core.server import register_shutdown_callback, server
 from core.utils import TransientNetworkError, handle_http_errors
 
 logger = logging.getLogger(__name__)
 
-# In-memory cache for user ID → display name (bounded to avoid unbounded growth)
+# In-memory LRU cache for user ID → (display name, monotonic expiry), bounded
+# to avoid unbounded growth. Names that could not be resolved (the raw user ID
+# is cached instead) expire quickly so a later lookup can still succeed.
 _SENDER_CACHE_MAX_SIZE = 256
-_sender_name_cache: Dict[str, str] = {}
+_SENDER_CACHE_TTL = 3600.0
+_SENDER_CACHE_NEGATIVE_TTL = 60.0
+_sender_name_cache: "OrderedDict[str, Tuple[str, float]]" = OrderedDict()
+# People API lookups in progress, so concurrent callers share one request
+_sender_inflight: Dict[str, "asyncio.Future[str]"] = {}
+# people.getBatchGet accepts at most this many resourceNames per request
+_PEOPLE_BATCH_GET_MAX = 200
+_PEOPLE_PERSON_FIELDS = "names,emailAddresses"
+# Chat annotation type for smart chips (see _extract_rich_links)
+_RICH_LINK_ANNOTATION = "RICH_LINK"
+# list_spaces space_type → spaces.list filter ("all" has no filter)
+_SPACE_TYPE_FILTERS = {
+    "room": "spaceType = SPACE",
+    "dm": "spaceType = DIRECT_MESSAGE",
+}
+# A googleapiclient service object shares one httplib2 transport, which is not
+# thread-safe: calls made through the same service must never overlap. Tools
+# issue them one after another; search_messages, which fans out one
+# messages.list per space with asyncio.gather, gates the threaded calls to
+# this many at a time.
 _SEARCH_MESSAGES_MAX_CONCURRENT_SPACE_FETCHES = 1
 _SEARCH_MESSAGES_SSL_RETRIES = 3
 _SEARCH_MESSAGES_RETRY_BASE_DELAY_SECONDS = 1
+# Attachment downloads are streamed in chunks of this size
+_CHAT_DOWNLOAD_CHUNK_BYTES = 256 * 1024
+# Raw bytes shown as a base64 preview in stateless mode (100 base64 characters)
+_STATELESS_PREVIEW_BYTES = 75
+# Blocking googleapiclient calls run on their own pool rather than the loop's
+# default executor, so a burst of Chat/People requests cannot starve other
+# asyncio.to_thread users (and vice versa)
+_GAPI_MAX_WORKERS = 32
+_gapi_executor = ThreadPoolExecutor(
+    max_workers=_GAPI_MAX_WORKERS, thread_name_prefix="gchat-api"
+)
+atexit.register(_gapi_executor.shutdown, wait=False)
+# Attachment downloads share one pooled client so repeated downloads reuse
+# connections instead of paying a new TCP + TLS handshake each time. httpx
+# clients are bound to the event loop they were first used on.
+_download_client: Optional[httpx.AsyncClient] = None
+_download_client_loop: Optional[asyncio.AbstractEventLoop] = None
+# Strong references to in-flight closes of replaced clients so they aren't GC'd
+_download_client_closes: set = set()
+# Serializes token refreshes so concurrent downloads don't all refresh at once.
+# asyncio locks are bound to the event loop they are first contended on, so one
+# is kept per loop like the download client.
+_token_refresh_lock: Optional[asyncio.Lock] = None
+_token_refresh_lock_loop: Optional[asyncio.AbstractEventLoop] = None
+
+
+async def _run_gapi(fn, *args, **kwargs):
+    """Run a blocking googleapiclient call on the shared Chat API thread pool."""
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(
+        _gapi_executor, functools.partial(fn, *args, **kwargs)
+    )
+
+
+def _get_download_client() -> httpx.AsyncClient:
+    """Return the shared attachment download client for the running loop."""
+    global _download_client, _download_client_loop
+    loop = asyncio.get_running_loop()
+    if _download_client is None or _download_client_loop is not loop:
+        if _download_client is not None:
+            _close_replaced_client(_download_client, _download_client_loop)
+        _download_client = httpx.AsyncClient(
+            follow_redirects=True,
+            limits=httpx.Limits(max_connections=32, max_keepalive_connections=16),
+            timeout=httpx.Timeout(60.0, connect=10.0),
+        )
+        _download_client_loop = loop
+    return _download_client
+
 
+def _close_replaced_client(
+    client: httpx.AsyncClient, client_loop: Optional[asyncio.AbstractEventLoop]
+) -> None:
+    """Close a download client that belongs to a different event loop.
 
-def _cache_sender(user_id: str, name: str) -> None:
-    """Store a resolved sender name, evicting oldest entries if cache is full."""
-    if len(_sender_name_cache) >= _SENDER_CACHE_MAX_SIZE:
-        to_remove = list(_sender_name_cache.keys())[: _SENDER_CACHE_MAX_SIZE // 2]
-        for k in to_remove:
-            del _sender_name_cache[k]
-    _sender_name_cache[user_id] = name
+    The close runs on the client's own loop while that loop is still running;
+    otherwise it runs on the current loop, which is all that's left to use.
+    """
+    if client_loop is not None and client_loop.is_running():
+        asyncio.run_coroutine_threadsafe(_aclose_quietly(client), client_loop)
+        return
+    task = asyncio.get_running_loop().create_task(_aclose_quietly(client))
+    _download_client_closes.add(task)
+    task.add_done_callback(_download_client_closes.discard)
+
+
+async def _aclose_quietly(client: httpx.AsyncClient) -> None:
+    try:
+        await client.aclose()
+    except Exception as e:
+        logger.debug(f"Failed to close replaced download client: {e}")
+
+
+@register_shutdown_callback
+async def _close_download_client() -> None:
+    """Close the shared download client at server shutdown."""
+    global _download_client, _download_client_loop
+    client, _download_client = _download_client, None
+    _download_client_loop = None
+    if client is not None:
+        await client.aclose()
+
+
+def _get_token_refresh_lock() -> asyncio.Lock:
+    """Return the token refresh lock for the running loop."""
+    global _token_refresh_lock, _token_refresh_lock_loop
+    loop = asyncio.get_running_loop()
+    if _token_refresh_lock is None or _token_refresh_lock_loop is not loop:
+        _token_refresh_lock = asyncio.Lock()
+        _token_refresh_lock_loop = loop
+    return _token_refresh_lock
+
+
+async def _bearer_token(service) -> str:
+    """Return the service's access token, refreshing it first if it has expired.
+
+    Credentials are normally refreshed when the service is built; this covers a
+    token that expires between then and the download. Only one refresh runs at a
+    time, and callers that waited on it reuse the refreshed token.
+    """
+    credentials = service._http.credentials
+    if getattr(credentials, "expired", False) and getattr(
+        credentials, "refresh_token", None
+    ):
+        async with _get_token_refresh_lock():
+            if credentials.expired:
+                await asyncio.to_thread(credentials.refresh, Request())
+    return credentials.token
+
+
+def _cache_sender(user_id: str, name: str, negative: bool = False) -> None:
+    """Store a resolved sender name, evicting the least recently used entry if full.
+
+    Pass negative=True when the lookup failed and name is only the raw user ID.
+    """
+    ttl = _SENDER_CACHE_NEGATIVE_TTL if negative else _SENDER_CACHE_TTL
+    _sender_name_cache[user_id] = (name, time.monotonic() + ttl)
+    _sender_name_cache.move_to_end(user_id)
+    if len(_sender_name_cache) > _SENDER_CACHE_MAX_SIZE:
+        _sender_name_cache.popitem(last=False)
+
+
+def _cached_sender_name(user_id: str) -> Optional[str]:
+    """Return an unexpired cached name, marking the hit as most recently used."""
+    entry = _sender_name_cache.get(user_id)
+    if entry is None:
+        return None
+    name, expires_at = entry
+    if expires_at <= time.monotonic():
+        del _sender_name_cache[user_id]
+        return None
+    _sender_name_cache.move_to_end(user_id)
+    return name
 
 
 async def _resolve_sender(people_service, sender_obj: dict) -> str:
@@ -52,29 +207,53 @@ async def _resolve_sender(people_service, sender_obj: dict) -> str:
     if not user_id:
         return "Unknown Sender"
 
-    # Check cache
-    if user_id in _sender_name_cache:
-        return _sender_name_cache[user_id]
+    cached = _cached_sender_name(user_id)
+    if cached is not None:
+        return cached
+
+    # Join a lookup already in flight for this user instead of repeating it
+    pending = _sender_inflight.get(user_id)
+    if pending is not None:
+        try:
+            return await asyncio.shield(pending)
+        except asyncio.CancelledError:
+            if not pending.cancelled():
+                raise
+            # The owning lookup was cancelled; fall through and do our own
+
+    future = asyncio.get_running_loop().create_future()
+    _sender_inflight[user_id] = future
+    try:
+        resolved = await _lookup_sender_name(people_service, user_id)
+        future.set_result(resolved)
+        return resolved
+    finally:
+        if _sender_inflight.get(user_id) is future:
+            del _sender_inflight[user_id]
+        if not future.done():
+            future.cancel()
+
+
+def _people_resource_name(user_id: str) -> str:
+    """Map a Chat "users/ID" resource name to the People API "people/ID" form."""
+    if user_id.startswith("users/"):
+        return "people/" + user_id[len("users/") :]
+    return user_id
 
+
+async def _lookup_sender_name(people_service, user_id: str) -> str:
+    """Look up a Chat user's display name via the People API and cache it."""
     # Try People API directory lookup
-    # Chat API uses "users/ID" but People API expects "people/ID"
-    people_resource = user_id.replace("users/", "people/", 1)
+    people_resource = _people_resource_name(user_id)
     if people_service:
         try:
-            person = await asyncio.to_thread(
+            person = await _run_gapi(
                 people_service.people()
-                .get(resourceName=people_resource, personFields="names,emailAddresses")
+                .get(resourceName=people_resource, personFields=_PEOPLE_PERSON_FIELDS)
                 .execute
             )
-            names = person.get("names", [])
-            if names:
-                resolved = names[0].get("displayName", user_id)
-                _cache_sender(user_id, resolved)
-                return resolved
-            # Fall back to email if no name
-            emails = person.get("emailAddresses", [])
-            if emails:
-                resolved = emails[0].get("value", user_id)
+            resolved = _person_display_name(person)
+            if resolved:
                 _cache_sender(user_id, resolved)
                 return resolved
         except HttpError as e:
@@ -83,10 +262,131 @@ async def _resolve_sender(people_service, sender_obj: dict) -> str:
             logger.debug(f"Unexpected error resolving {user_id}: {e}")
 
     # Final fallback
-    _cache_sender(user_id, user_id)
+    _cache_sender(user_id, user_id, negative=True)
     return user_id
 
 
+def _person_display_name(person: dict) -> Optional[str]:
+    """Return a People API person's display name, falling back to their email."""
+    names = person.get("names", [])
+    if names:
+        return names[0].get("displayName") or None
+    # Fall back to email if no name
+    emails = person.get("emailAddresses", [])
+    if emails:
+        return emails[0].get("value") or None
+    return None
+
+
+async def _resolve_senders_batch(
+    people_service, sender_objs: List[dict]
+) -> Dict[str, str]:
+    """Resolve many Chat senders to display names, keyed by sender resource name.
+
+    Senders with a displayName or a cached name are answered locally. The rest
+    are looked up with people.getBatchGet, one request per 200 users, instead
+    of one people.get per sender.
+    """
+    resolved: Dict[str, str] = {}
+    pending: Dict[str, "asyncio.Future[str]"] = {}
+    to_fetch: List[str] = []
+    seen = set()
+    for sender_obj in sender_objs:
+        user_id = sender_obj.get("name", "")
+        if not user_id or user_id in seen:
+            continue
+        seen.add(user_id)
+        display_name = sender_obj.get("displayName")
+        if display_name:
+            resolved[user_id] = display_name
+            continue
+        cached = _cached_sender_name(user_id)
+        if cached is not None:
+            resolved[user_id] = cached
+        elif user_id in _sender_inflight:
+            pending[user_id] = _sender_inflight[user_id]
+        else:
+            to_fetch.append(user_id)
+
+    if to_fetch:
+        # Register the batch as in flight so single lookups join it
+        loop = asyncio.get_running_loop()
+        futures = {user_id: loop.create_future() for user_id in to_fetch}
+        _sender_inflight.update(futures)
+        try:
+            for start in range(0, len(to_fetch), _PEOPLE_BATCH_GET_MAX):
+                chunk = to_fetch[start : start + _PEOPLE_BATCH_GET_MAX]
+                names = await _batch_lookup_sender_names(people_service, chunk)
+                for user_id in chunk:
+                    name = names.get(user_id)
+                    if name:
+                        _cache_sender(user_id, name)
+                    else:
+                        name = user_id
+                        _cache_sender(user_id, name, negative=True)
+                    resolved[user_id] = name
+                    futures[user_id].set_result(name)
+        finally:
+            for user_id, future in futures.items():
+                if _sender_inflight.get(user_id) is future:
+                    del _sender_inflight[user_id]
+                if not future.done():
+                    future.cancel()
+
+    # Wait for lookups started by other callers; a failure in one of them only
+    # costs that sender its display name. Awaited one at a time because, if an
+    # owner was cancelled, _resolve_sender falls back to its own People API
+    # call on the shared people_service, whose transport must not see
+    # overlapping calls.
+    for user_id in pending:
+        try:
+            resolved[user_id] = await _resolve_sender(people_service, {"name": user_id})
+        except Exception as e:
+            logger.debug(f"Shared lookup failed for {user_id}: {e}")
+            resolved[user_id] = user_id
+
+    return resolved
+
+
+def _sender_label(sender_map: Dict[str, str], sender_obj: dict) -> str:
+    """Name a message sender using the result of _resolve_senders_batch."""
+    return sender_obj.get("displayName") or sender_map.get(
+        sender_obj.get("name", ""), "Unknown Sender"
+    )
+
+
+async def _batch_lookup_sender_names(
+    people_service, user_ids: List[str]
+) -> Dict[str, str]:
+    """Fetch display names for up to 200 Chat users in one People API request."""
+    if not people_service:
+        return {}
+    people_to_user = {_people_resource_name(user_id): user_id for user_id in user_ids}
+    try:
+        response = await _run_gapi(
+            people_service.people()
+            .getBatchGet(
+                resourceNames=list(people_to_user),
+                personFields=_PEOPLE_PERSON_FIELDS,
+            )
+            .execute
+        )
+    except HttpError as e:
+        logger.debug(f"People API batch lookup failed for {len(user_ids)} users: {e}")
+        return {}
+    except Exception as e:
+        logger.debug(f"Unexpected error batch resolving {len(user_ids)} users: {e}")
+        return {}
+
+    names: Dict[str, str] = {}
+    for entry in response.get("responses", []):
+        user_id = people_to_user.get(entry.get("requestedResourceName", ""))
+        name = _person_display_name(entry.get("person") or {})
+        if user_id and name:
+            names[user_id] = name
+    return names
+
+
 async def _execute_chat_request(
     request_factory,
     *,
@@ -98,9 +398,9 @@ async def _execute_chat_request(
     for attempt in range(retries):
         try:
             if semaphore is None:
-                return await asyncio.to_thread(lambda: request_factory().execute())
+                return await _run_gapi(lambda: request_factory().execute())
             async with semaphore:
-                return await asyncio.to_thread(lambda: request_factory().execute())
+                return await _run_gapi(lambda: request_factory().execute())
         except ssl.SSLError as e:
             if attempt == retries - 1:
                 raise
@@ -123,14 +423,26 @@ def _extract_rich_links(msg: dict) -> List[str]:
     smart chip, the URL is NOT in the text field — it's only available in
     the annotations array as a RICH_LINK with richLinkMetadata.uri.
     """
+    annotations = msg.get("annotations")
+    if not annotations:
+        return []
     text = msg.get("text", "")
-    urls = []
-    for ann in msg.get("annotations", []):
-        if ann.get("type") == "RICH_LINK":
-            uri = ann.get("richLinkMetadata", {}).get("uri", "")
-            if uri and uri not in text:
-                urls.append(uri)
-    return urls
+    return [
+        uri
+        for ann in annotations
+        if ann.get("type") == _RICH_LINK_ANNOTATION
+        and (uri := (ann.get("richLinkMetadata") or {}).get("uri"))
+        and uri not in text
+    ]
+
+
+def _format_reaction(reaction: dict) -> str:
+    """Render one emojiReactionSummary as "👍x2" or ":custom-uid:x1"."""
+    emoji = reaction.get("emoji") or {}
+    symbol = (
+        emoji.get("unicode") or f":{(emoji.get('customEmoji') or {}).get('uid', '?')}:"
+    )
+    return f"{symbol}x{reaction.get('reactionCount', 0)}"
 
 
 @server.tool()
@@ -150,18 +462,12 @@ async def list_spaces(
     """
     logger.info(f"[list_spaces] Email={user_google_email}, Type={space_type}")
 
-    # Build filter based on space_type
-    filter_param = None
-    if space_type == "room":
-        filter_param = "spaceType = SPACE"
-    elif space_type == "dm":
-        filter_param = "spaceType = DIRECT_MESSAGE"
-
     request_params = {"pageSize": page_size}
+    filter_param = _SPACE_TYPE_FILTERS.get(space_type)
     if filter_param:
         request_params["filter"] = filter_param
 
-    response = await asyncio.to_thread(service.spaces().list(**request_params).execute)
+    response = await _run_gapi(service.spaces().list(**request_params).execute)
 
     spaces = response.get("spaces", [])
     if not spaces:
@@ -214,81 +520,54 @@ async def get_messages(
     """
     logger.info(f"[get_messages] Space ID: '{space_id}' for user '{user_google_email}'")
 
-    # Get space info first
-    space_info = await asyncio.to_thread(
-        chat_service.spaces().get(name=space_id).execute
-    )
-    space_name = space_info.get("displayName", "Unknown Space")
-
-    # Get messages
     list_params = {"parent": space_id, "pageSize": page_size, "orderBy": order_by}
     if message_filter is not None:
         list_params["filter"] = message_filter
-    response = await asyncio.to_thread(
+
+    # Sequential: both requests share chat_service's non-thread-safe transport
+    space_info = await _run_gapi(chat_service.spaces().get(name=space_id).execute)
+    response = await _run_gapi(
         chat_service.spaces().messages().list(**list_params).execute
     )
+    space_name = space_info.get("displayName", "Unknown Space")
 
     messages = response.get("messages", [])
     if not messages:
         return f"No messages found in space '{space_name}' (ID: {space_id})."
 
-    # Pre-resolve unique senders in parallel
-    sender_lookup = {}
-    for msg in messages:
-        s = msg.get("sender", {})
-        key = s.get("name", "")
-        if key and key not in sender_lookup:
-            sender_lookup[key] = s
-    resolved_names = await asyncio.gather(
-        *[_resolve_sender(people_service, s) for s in sender_lookup.values()]
+    # Pre-resolve unique senders with one batched People API request
+    sender_map = await _resolve_senders_batch(
+        people_service, [msg.get("sender", {}) for msg in messages]
     )
-    sender_map = dict(zip(sender_lookup.keys(), resolved_names))
 
     output = [f"Messages from '{space_name}' (ID: {space_id}):\n"]
+    append = output.append
     for msg in messages:
-        sender_obj = msg.get("sender", {})
-        sender_key = sender_obj.get("name", "")
-        sender = sender_map.get(sender_key) or await _resolve_sender(
-            people_service, sender_obj
-        )
+        sender = _sender_label(sender_map, msg.get("sender", {}))
         create_time = msg.get("createTime", "Unknown Time")
         text_content = msg.get("text", "No text content")
         msg_name = msg.get("name", "")
 
-        output.append(f"[{create_time}] {sender}:")
-        output.append(f"  {text_content}")
-        rich_links = _extract_rich_links(msg)
-        for url in rich_links:
-            output.append(f"  [linked: {url}]")
+        append(f"[{create_time}] {sender}:\n  {text_content}")
+        output.extend(f"  [linked: {url}]" for url in _extract_rich_links(msg))
         # Show attachments
-        attachments = msg.get("attachment", [])
-        for idx, att in enumerate(attachments):
+        for idx, att in enumerate(msg.get("attachment", [])):
             att_name = att.get("contentName", "unnamed")
             att_type = att.get("contentType", "unknown type")
-            att_resource = att.get("name", "")
-            output.append(f"  [attachment {idx}: {att_name} ({att_type})]")
-            if att_resource:
-                output.append(
+            append(f"  [attachment {idx}: {att_name} ({att_type})]")
+            if att.get("name"):
+                append(
                     f"  Use download_chat_attachment(message_id='{msg_name}', attachment_index={idx}) to download"
                 )
         # Show thread info if this is a threaded reply
         thread = msg.get("thread", {})
         if msg.get("threadReply") and thread.get("name"):
-            output.append(f"  [thread: {thread['name']}]")
+            append(f"  [thread: {thread['name']}]")
         # Show emoji reactions
         reactions = msg.get("emojiReactionSummaries", [])
         if reactions:
-            parts = []
-            for r in reactions:
-                emoji = r.get("emoji", {})
-                symbol = emoji.get("unicode", "")
-                if not symbol:
-                    ce = emoji.get("customEmoji", {})
-                    symbol = f":{ce.get('uid', '?')}:"
-                count = r.get("reactionCount", 0)
-                parts.append(f"{symbol}x{count}")
-            output.append(f"  [reactions: {', '.join(parts)}]")
-        output.append(f"  (Message ID: {msg_name})\n")
+            append(f"  [reactions: {', '.join(map(_format_reaction, reactions))}]")
+        append(f"  (Message ID: {msg_name})\n")
 
     return "\n".join(output)
 
@@ -328,7 +607,7 @@ async def send_message(
         message_body["thread"] = {"threadKey": thread_key}
         request_params["messageReplyOption"] = "REPLY_MESSAGE_FALLBACK_TO_NEW_THREAD"
 
-    message = await asyncio.to_thread(
+    message = await _run_gapi(
         service.spaces().messages().create(**request_params).execute
     )
 
@@ -423,11 +702,13 @@ async def search_messages(
             _SEARCH_MESSAGES_MAX_CONCURRENT_SPACE_FETCHES
         )
 
+        base_list_params = {"pageSize": page_size}
+        if filter_str:
+            base_list_params["filter"] = filter_str
+
         async def fetch_space_messages(space: dict) -> tuple[List[dict], bool]:
             try:
-                list_params = {"parent": space.get("name"), "pageSize": page_size}
-                if filter_str:
-                    list_params["filter"] = filter_str
+                list_params = {"parent": space.get("name"), **base_list_params}
                 response = await _execute_chat_request(
                     lambda: chat_service.spaces().messages().list(**list_params),
                     request_label=f"fetching messages for {space.get('name')}",
@@ -480,25 +761,16 @@ async def search_messages(
         )
         return f"No messages found matching '{search_desc}' in {context}.{suffix}"
 
-    # Resolve senders sequentially. The underlying googleapiclient/httplib2
-    # service objects are not safe to fan out heavily and can trigger SSL churn.
-    sender_lookup = {}
-    for msg in messages:
-        s = msg.get("sender", {})
-        key = s.get("name", "")
-        if key and key not in sender_lookup:
-            sender_lookup[key] = s
-    sender_map = {}
-    for key, sender_obj in sender_lookup.items():
-        sender_map[key] = await _resolve_sender(people_service, sender_obj)
+    # Resolve senders with batched People API requests, issued one at a time.
+    # The underlying googleapiclient/httplib2 service objects are not safe to
+    # fan out heavily and can trigger SSL churn.
+    sender_map = await _resolve_senders_batch(
+        people_service, [msg.get("sender", {}) for msg in messages]
+    )
 
     output = [f"Found {len(messages)} messages matching '{search_desc}' in {context}:"]
     for msg in messages:
-        sender_obj = msg.get("sender", {})
-        sender_key = sender_obj.get("name", "")
-        sender = sender_map.get(sender_key) or await _resolve_sender(
-            people_service, sender_obj
-        )
+        sender = _sender_label(sender_map, msg.get("sender", {}))
         create_time = msg.get("createTime", "Unknown Time")
         text_content = msg.get("text", "No text content")
         space_name = msg.get("_space_name", "Unknown Space")
@@ -542,7 +814,7 @@ async def create_reaction(
     """
     logger.info(f"[create_reaction] Message: '{message_id}', Emoji: '{emoji_unicode}'")
 
-    reaction = await asyncio.to_thread(
+    reaction = await _run_gapi(
         service.spaces()
         .messages()
         .reactions()
@@ -584,9 +856,7 @@ async def download_chat_attachment(
     )
 
     # Fetch the message to get attachment metadata
-    msg = await asyncio.to_thread(
-        service.spaces().messages().get(name=message_id).execute
-    )
+    msg = await _run_gapi(service.spaces().messages().get(name=message_id).execute)
 
     attachments = msg.get("attachment", [])
     if not attachments:
@@ -625,50 +895,70 @@ async def download_chat_attachment(
     resource_name = media_resource or att_name
     download_url = f"https://chat.googleapis.com/v1/media/{resource_name}?alt=media"
 
+    # Stream the body instead of buffering it: in stateless mode only a short
+    # preview is kept, otherwise chunks go straight to a temp file in storage
+    stateless = is_stateless_mode()
+    storage = None if stateless else get_attachment_storage()
+    temp_path = None
+    preview = b""
+    size_bytes = 0
+    # The temp file is removed on every exit (including cancellation) until
+    # save_attachment_from_path has taken ownership of it
     try:
-        access_token = service._http.credentials.token
-        async with httpx.AsyncClient(follow_redirects=True) as client:
-            resp = await client.get(
+        try:
+            access_token = await _bearer_token(service)
+            async with _get_download_client().stream(
+                "GET",
                 download_url,
                 headers={"Authorization": f"Bearer {access_token}"},
+            ) as resp:
+                if resp.status_code != 200:
+                    await resp.aread()
+                    body = resp.text[:500]
+                    return (
+                        f"Failed to download attachment '{filename}': "
+                        f"HTTP {resp.status_code} from {download_url}\n{body}"
+                    )
+                if storage is None:
+                    async for chunk in resp.aiter_bytes(_CHAT_DOWNLOAD_CHUNK_BYTES):
+                        if len(preview) < _STATELESS_PREVIEW_BYTES:
+                            preview += chunk[: _STATELESS_PREVIEW_BYTES - len(preview)]
+                        size_bytes += len(chunk)
+                else:
+                    fd, temp_path = storage.create_temp_file()
+                    with os.fdopen(fd, "wb") as out:
+                        async for chunk in resp.aiter_bytes(_CHAT_DOWNLOAD_CHUNK_BYTES):
+                            await asyncio.to_thread(out.write, chunk)
+                            size_bytes += len(chunk)
+        except Exception as e:
+            return f"Failed to download attachment '{filename}': {e}"
+
+        size_kb = size_bytes / 1024
+
+        # Check if we're in stateless mode (can't save files)
+        if storage is None:
+            b64_preview = base64.urlsafe_b64encode(preview).decode("utf-8")
+            return "\n".join(
+                [
+                    f"Attachment downloaded: {filename} ({content_type})",
+                    f"Size: {size_kb:.1f} KB ({size_bytes} bytes)",
+                    "",
+                    "Stateless mode: File storage disabled.",
+                    f"Base64 preview: {b64_preview}...",
+                ]
             )
-            if resp.status_code != 200:
-                body = resp.text[:500]
-                return (
-                    f"Failed to download attachment '{filename}': "
-                    f"HTTP {resp.status_code} from {download_url}\n{body}"
-                )
-            file_bytes = resp.content
-    except Exception as e:
-        return f"Failed to download attachment '{filename}': {e}"
-
-    size_bytes = len(file_bytes)
-    size_kb = size_bytes / 1024
-
-    # Check if we're in stateless mode (can't save files)
-    from auth.oauth_config import is_stateless_mode
-
-    if is_stateless_mode():
-        b64_preview = base64.urlsafe_b64encode(file_bytes).decode("utf-8")[:100]
-        return "\n".join(
-            [
-                f"Attachment downloaded: {filename} ({content_type})",
-                f"Size: {size_kb:.1f} KB ({size_bytes} bytes)",
-                "",
-                "Stateless mode: File storage disabled.",
-                f"Base64 preview: {b64_preview}...",
-            ]
-        )
-
-    # Save to local disk
-    from core.attachment_storage import get_attachment_storage, get_attachment_url
-    from core.config import get_transport_mode
 
-    storage = get_attachment_storage()
-    b64_data = base64.urlsafe_b64encode(file_bytes).decode("utf-8")
-    result = storage.save_attachment(
-        base64_data=b64_data, filename=filename, mime_type=content_type
-    )
+        # Move the downloaded file into attachment storage
+        result = storage.save_attachment_from_path(
+            temp_path, filename=filename, mime_type=content_type
+        )
+        temp_path = None
+    finally:
+        if temp_path is not None:
+            try:
+                os.unlink(temp_path)
+            except OSError:
+                pass
 
     result_lines = [
         f"Attachment downloaded: {filename}",
@@ -5,7 +5,10 @@ This module provides utility functions for common Google Docs operations
 to simplify the implementation of document editing tools.
 """
 
+import functools
 import logging
+import re
+from bisect import bisect_left
 from typing import Dict, Any, Optional, List
 
 logger = logging.getLogger(__name__)
@@ -177,6 +180,9 @@ def _build_tabs_criteria(tab_id: Optional[str]) -> Optional[Dict[str, Any]]:
     return {"tabIds": [tab_id]}
 
 
+_HEX_COLOR_RE = re.compile(r"#[0-9a-fA-F]{6}")
+
+
 def _normalize_color(
     color: Optional[str], param_name: str
 ) -> Optional[Dict[str, float]]:
@@ -188,20 +194,21 @@ def _normalize_color(
     if color is None:
         return None
 
-    if not isinstance(color, str):
+    rgb = _parse_hex_color(color) if isinstance(color, str) else None
+    if rgb is None:
         raise ValueError(f"{param_name} must be a hex string like '#RRGGBB'")
 
-    if len(color) != 7 or not color.startswith("#"):
-        raise ValueError(f"{param_name} must be a hex string like '#RRGGBB'")
+    red, green, blue = rgb
+    return {"red": red, "green": green, "blue": blue}
 
-    hex_color = color[1:]
-    if any(c not in "0123456789abcdefABCDEF" for c in hex_color):
-        raise ValueError(f"{param_name} must be a hex string like '#RRGGBB'")
 
-    r = int(hex_color[0:2], 16) / 255
-    g = int(hex_color[2:4], 16) / 255
-    b = int(hex_color[4:6], 16) / 255
-    return {"red": r, "green": g, "blue": b}
+@functools.lru_cache(maxsize=256)
+def _parse_hex_color(color: str) -> Optional[tuple[float, float, float]]:
+    """Parse "#RRGGBB" into 0-1 channel values, or None if it is malformed."""
+    if not _HEX_COLOR_RE.fullmatch(color):
+        return None
+    rgb = int(color[1:], 16)
+    return ((rgb >> 16) / 255, ((rgb >> 8) & 0xFF) / 255, (rgb & 0xFF) / 255)
 
 
 def build_text_style(
@@ -243,24 +250,18 @@ def build_text_style(
     text_style = {}
     fields = []
 
-    if bold is not None:
-        text_style["bold"] = bold
-        fields.append("bold")
-
-    if italic is not None:
-        text_style["italic"] = italic
-        fields.append("italic")
-
-    if underline is not None:
-        text_style["underline"] = underline
-        fields.append("underline")
-
-    if strikethrough is not None:
-        text_style["strikethrough"] = strikethrough
-        fields.append("strikethrough")
+    for value, field_name in (
+        (bold, "bold"),
+        (italic, "italic"),
+        (underline, "underline"),
+        (strikethrough, "strikethrough"),
+    ):
+        if value is not None:
+            text_style[field_name] = value
+            fields.append(field_name)
 
     if font_size is not None:
-        text_style["fontSize"] = {"magnitude": font_size, "unit": "PT"}
+        text_style["fontSize"] = _build_dimension(font_size)
         fields.append("fontSize")
 
     if font_family is not None or font_weight is not None:
@@ -272,15 +273,13 @@ def build_text_style(
         text_style["weightedFontFamily"] = weighted_font_family
         fields.append("weightedFontFamily")
 
-    if text_color is not None:
-        rgb = _normalize_color(text_color, "text_color")
-        text_style["foregroundColor"] = {"color": {"rgbColor": rgb}}
-        fields.append("foregroundColor")
-
-    if background_color is not None:
-        rgb = _normalize_color(background_color, "background_color")
-        text_style["backgroundColor"] = {"color": {"rgbColor": rgb}}
-        fields.append("backgroundColor")
+    for value, param_name, field_name in (
+        (text_color, "text_color", "foregroundColor"),
+        (background_color, "background_color", "backgroundColor"),
+    ):
+        if value is not None:
+            text_style[field_name] = _build_optional_color(value, param_name)
+            fields.append(field_name)
 
     if link_url is not None and clear_link:
         raise ValueError("link_url and clear_link cannot both be provided")
@@ -386,28 +385,16 @@ def build_paragraph_style(
         paragraph_style["lineSpacing"] = line_spacing * 100
         fields.append("lineSpacing")
 
-    if indent_first_line is not None:
-        paragraph_style["indentFirstLine"] = {
-            "magnitude": indent_first_line,
-            "unit": "PT",
-        }
-        fields.append("indentFirstLine")
-
-    if indent_start is not None:
-        paragraph_style["indentStart"] = {"magnitude": indent_start, "unit": "PT"}
-        fields.append("indentStart")
-
-    if indent_end is not None:
-        paragraph_style["indentEnd"] = {"magnitude": indent_end, "unit": "PT"}
-        fields.append("indentEnd")
-
-    if space_above is not None:
-        paragraph_style["spaceAbove"] = {"magnitude": space_above, "unit": "PT"}
-        fields.append("spaceAbove")
-
-    if space_below is not None:
-        paragraph_style["spaceBelow"] = {"magnitude": space_below, "unit": "PT"}
-        fields.append("spaceBelow")
+    for value, field_name in (
+        (indent_first_line, "indentFirstLine"),
+        (indent_start, "indentStart"),
+        (indent_end, "indentEnd"),
+        (space_above, "spaceAbove"),
+        (space_below, "spaceBelow"),
+    ):
+        if value is not None:
+            paragraph_style[field_name] = _build_dimension(value)
+            fields.append(field_name)
 
     if direction is not None:
         direction_upper = direction.upper()
@@ -418,21 +405,15 @@ def build_paragraph_style(
         paragraph_style["direction"] = direction_upper
         fields.append("direction")
 
-    if keep_lines_together is not None:
-        paragraph_style["keepLinesTogether"] = keep_lines_together
-        fields.append("keepLinesTogether")
-
-    if keep_with_next is not None:
-        paragraph_style["keepWithNext"] = keep_with_next
-        fields.append("keepWithNext")
-
-    if avoid_widow_and_orphan is not None:
-        paragraph_style["avoidWidowAndOrphan"] = avoid_widow_and_orphan
-        fields.append("avoidWidowAndOrphan")
-
-    if page_break_before is not None:
-        paragraph_style["pageBreakBefore"] = page_break_before
-        fields.append("pageBreakBefore")
+    for value, field_name in (
+        (keep_lines_together, "keepLinesTogether"),
+        (keep_with_next, "keepWithNext"),
+        (avoid_widow_and_orphan, "avoidWidowAndOrphan"),
+        (page_break_before, "pageBreakBefore"),
+    ):
+        if value is not None:
+            paragraph_style[field_name] = value
+            fields.append(field_name)
 
     if spacing_mode is not None:
         spacing_mode_upper = spacing_mode.upper()
@@ -641,7 +622,7 @@ def build_table_cell_style(
         border_style = {}
 
         if border_width is not None:
-            border_style["width"] = {"magnitude": border_width, "unit": "PT"}
+            border_style["width"] = _build_dimension(border_width)
 
         if border_color is not None:
             rgb = _normalize_color(border_color, "border_color")
@@ -663,7 +644,7 @@ def build_table_cell_style(
         (padding_right, "paddingRight"),
     ):
         if padding_value is not None:
-            table_cell_style[api_key] = {"magnitude": padding_value, "unit": "PT"}
+            table_cell_style[api_key] = _build_dimension(padding_value)
             fields.append(api_key)
 
     if content_alignment is not None:
@@ -789,6 +770,26 @@ def create_format_text_request(
     Returns:
         Dictionary representing the updateTextStyle request, or None if no styles provided
     """
+    if all(
+        value is None
+        for value in (
+            bold,
+            italic,
+            underline,
+            strikethrough,
+            font_size,
+            font_family,
+            font_weight,
+            text_color,
+            background_color,
+            link_url,
+            clear_link,
+            baseline_offset,
+            small_caps,
+        )
+    ):
+        return None
+
     text_style, fields = build_text_style(
         bold,
         italic,
@@ -860,6 +861,29 @@ def create_update_paragraph_style_request(
     Returns:
         Dictionary representing the updateParagraphStyle request, or None if no styles provided
     """
+    if all(
+        value is None
+        for value in (
+            heading_level,
+            alignment,
+            line_spacing,
+            indent_first_line,
+            indent_start,
+            indent_end,
+            space_above,
+            space_below,
+            named_style_type,
+            direction,
+            keep_lines_together,
+            keep_with_next,
+            avoid_widow_and_orphan,
+            page_break_before,
+            spacing_mode,
+            shading_color,
+        )
+    ):
+        return None
+
     paragraph_style, fields = build_paragraph_style(
         heading_level=heading_level,
         alignment=alignment,
@@ -1163,9 +1187,9 @@ def create_insert_image_request(
     # Add size properties if specified
     object_size = {}
     if width is not None:
-        object_size["width"] = {"magnitude": width, "unit": "PT"}
+        object_size["width"] = _build_dimension(width)
     if height is not None:
-        object_size["height"] = {"magnitude": height, "unit": "PT"}
+        object_size["height"] = _build_dimension(height)
 
     if object_size:
         request["insertInlineImage"]["objectSize"] = object_size
@@ -1254,12 +1278,9 @@ def create_bullet_list_request(
             inserted_char_count += nesting_level
 
         # Keep createParagraphBullets range aligned to the same logical content.
-        start_index += (
-            sum(1 for idx in paragraph_starts if idx < original_start) * nesting_level
-        )
-        end_index += (
-            sum(1 for idx in paragraph_starts if idx < original_end) * nesting_level
-        )
+        # paragraph_starts is sorted, so bisect counts the starts before each bound.
+        start_index += bisect_left(paragraph_starts, original_start) * nesting_level
+        end_index += bisect_left(paragraph_starts, original_end) * nesting_level
 
     # Create the bullet list
     range_obj = _build_range(start_index, end_index, doc_tab_id, segment_id)
@@ -1644,7 +1665,7 @@ def create_update_table_column_properties_request(
     fields = []
 
     if width is not None:
-        properties["width"] = {"magnitude": width, "unit": "PT"}
+        properties["width"] = _build_dimension(width)
         fields.append("width")
 
     if width_type is not None:
@@ -1664,6 +1685,61 @@ def create_update_table_column_properties_request(
     }
 
 
+# Required fields for each batch operation type, in the order they are reported
+_REQUIRED_OPERATION_FIELDS = {
+    "insert_text": ("text",),
+    "delete_text": ("start_index", "end_index"),
+    "replace_text": ("start_index", "end_index", "text"),
+    "format_text": ("start_index", "end_index"),
+    "update_paragraph_style": ("start_index", "end_index"),
+    "update_table_cell_style": ("table_start_index",),
+    "insert_table": ("rows", "columns"),
+    "insert_page_break": (),
+    "insert_section_break": (),
+    "find_replace": ("find_text", "replace_text"),
+    "create_bullet_list": ("start_index", "end_index"),
+    "create_named_range": ("name", "start_index", "end_index"),
+    "replace_named_range_content": ("text",),
+    "delete_named_range": (),
+    "update_document_style": (),
+    "update_section_style": ("start_index", "end_index"),
+    "create_header_footer": ("section_type",),
+    "insert_image": ("image_uri",),
+    "insert_doc_tab": ("title", "index"),
+    "delete_doc_tab": ("tab_id",),
+    "update_doc_tab": ("tab_id", "title"),
+    "insert_table_row": ("table_start_index", "row_index"),
+    "delete_table_row": ("table_start_index", "row_index"),
+    "insert_table_column": ("table_start_index", "column_index"),
+    "delete_table_column": ("table_start_index", "column_index"),
+    "merge_table_cells": (
+        "table_start_index",
+        "row_index",
+        "column_index",
+        "row_span",
+        "column_span",
+    ),
+    "unmerge_table_cells": (
+        "table_start_index",
+        "row_index",
+        "column_index",
+        "row_span",
+        "column_span",
+    ),
+    "update_table_column_properties": ("table_start_index", "column_indices"),
+}
+
+_INSERT_OPERATION_TYPES = frozenset(
+    {
+        "insert_text",
+        "insert_table",
+        "insert_page_break",
+        "insert_section_break",
+        "insert_image",
+    }
+)
+
+
 def validate_operation(operation: Dict[str, Any]) -> tuple[bool, str]:
     """
     Validate a batch operation dictionary.
@@ -1678,64 +1754,15 @@ def validate_operation(operation: Dict[str, Any]) -> tuple[bool, str]:
     if not op_type:
         return False, "Missing 'type' field"
 
-    # Validate required fields for each operation type
-    required_fields = {
-        "insert_text": ["text"],
-        "delete_text": ["start_index", "end_index"],
-        "replace_text": ["start_index", "end_index", "text"],
-        "format_text": ["start_index", "end_index"],
-        "update_paragraph_style": ["start_index", "end_index"],
-        "update_table_cell_style": ["table_start_index"],
-        "insert_table": ["rows", "columns"],
-        "insert_page_break": [],
-        "insert_section_break": [],
-        "find_replace": ["find_text", "replace_text"],
-        "create_bullet_list": ["start_index", "end_index"],
-        "create_named_range": ["name", "start_index", "end_index"],
-        "replace_named_range_content": ["text"],
-        "delete_named_range": [],
-        "update_document_style": [],
-        "update_section_style": ["start_index", "end_index"],
-        "create_header_footer": ["section_type"],
-        "insert_image": ["image_uri"],
-        "insert_doc_tab": ["title", "index"],
-        "delete_doc_tab": ["tab_id"],
-        "update_doc_tab": ["tab_id", "title"],
-        "insert_table_row": ["table_start_index", "row_index"],
-        "delete_table_row": ["table_start_index", "row_index"],
-        "insert_table_column": ["table_start_index", "column_index"],
-        "delete_table_column": ["table_start_index", "column_index"],
-        "merge_table_cells": [
-            "table_start_index",
-            "row_index",
-            "column_index",
-            "row_span",
-            "column_span",
-        ],
-        "unmerge_table_cells": [
-            "table_start_index",
-            "row_index",
-            "column_index",
-            "row_span",
-            "column_span",
-        ],
-        "update_table_column_properties": ["table_start_index", "column_indices"],
-    }
-
-    if op_type not in required_fields:
+    required_fields = _REQUIRED_OPERATION_FIELDS.get(op_type)
+    if required_fields is None:
         return False, f"Unsupported operation type: {op_type or 'None'}"
 
-    for field in required_fields[op_type]:
+    for field in required_fields:
         if field not in operation:
             return False, f"Missing required field: {field}"
 
-    if op_type in {
-        "insert_text",
-        "insert_table",
-        "insert_page_break",
-        "insert_section_break",
-        "insert_image",
-    }:
+    if op_type in _INSERT_OPERATION_TYPES:
         end_of_segment = operation.get("end_of_segment", False)
         if end_of_segment and "index" in operation:
             return (
@@ -15,12 +15,13 @@ Converts Google Docs API JSON responses to clean Markdown, preserving:
 from __future__ import annotations
 
 import logging
+from collections import defaultdict
 from datetime import datetime
 from typing import Any
 
 logger = logging.getLogger(__name__)
 
-MONO_FONTS = {"Courier New", "Consolas", "Roboto Mono", "Source Code Pro"}
+MONO_FONTS = frozenset({"Courier New", "Consolas", "Roboto Mono", "Source Code Pro"})
 
 HEADING_MAP = {
     "TITLE": "#",
@@ -33,6 +34,11 @@ HEADING_MAP = {
     "HEADING_6": "######",
 }
 
+# Google Docs lists have nesting levels 0-8; indents are precomputed per level
+_MAX_NESTING_LEVEL = 8
+_ORDERED_INDENTS = tuple("   " * i for i in range(_MAX_NESTING_LEVEL + 1))
+_UNORDERED_INDENTS = tuple("  " * i for i in range(_MAX_NESTING_LEVEL + 1))
+
 
 def convert_doc_to_markdown(doc: dict[str, Any]) -> str:
     """Convert a Google Docs API document response to markdown.
@@ -97,9 +103,14 @@ def _convert_body_to_markdown(doc: dict[str, Any]) -> str:
     inline_objects = doc.get("inlineObjects", {})
 
     lines: list[str] = []
-    ordered_counters: dict[tuple[str, int], int] = {}
+    ordered_counters: defaultdict[tuple[str, int], int] = defaultdict(int)
+    # A document has few distinct (list_id, nesting) pairs but many bullets
+    list_kinds: dict[tuple[str, int], str] = {}
     prev_was_list = False
     footnote_defs: list[tuple[str, str]] = []
+    # Bound once: these run for every element of potentially very long docs
+    append = lines.append
+    heading_prefix = HEADING_MAP.get
 
     for element in content:
         if "paragraph" in element:
@@ -111,7 +122,7 @@ def _convert_body_to_markdown(doc: dict[str, Any]) -> str:
                 footnote_defs=footnote_defs,
             )
 
-            if not text.strip():
+            if not text:
                 if prev_was_list:
                     prev_was_list = False
                 continue
@@ -119,12 +130,16 @@ def _convert_body_to_markdown(doc: dict[str, Any]) -> str:
             bullet = para.get("bullet")
             if bullet:
                 list_id = bullet["listId"]
-                nesting = bullet.get("nestingLevel", 0)
+                nesting = min(bullet.get("nestingLevel", 0), _MAX_NESTING_LEVEL)
+                key = (list_id, nesting)
+                kind = list_kinds.get(key)
+                if kind is None:
+                    kind = list_kinds[key] = _list_kind(lists_meta, list_id, nesting)
 
-                if _is_checklist(lists_meta, list_id, nesting):
+                if kind == "checklist":
                     checked = _is_checked(para)
                     checkbox = "[x]" if checked else "[ ]"
-                    indent = "  " * nesting
+                    indent = _UNORDERED_INDENTS[nesting]
                     cb_text = (
                         _convert_paragraph_text(
                             para,
@@ -136,38 +151,37 @@ def _convert_body_to_markdown(doc: dict[str, Any]) -> str:
                         if checked
                         else text
                     )
-                    lines.append(f"{indent}- {checkbox} {cb_text}")
-                elif _is_ordered_list(lists_meta, list_id, nesting):
-                    key = (list_id, nesting)
-                    ordered_counters[key] = ordered_counters.get(key, 0) + 1
+                    append(f"{indent}- {checkbox} {cb_text}")
+                elif kind == "ordered":
+                    ordered_counters[key] += 1
                     counter = ordered_counters[key]
-                    indent = "   " * nesting
-                    lines.append(f"{indent}{counter}. {text}")
+                    indent = _ORDERED_INDENTS[nesting]
+                    append(f"{indent}{counter}. {text}")
                 else:
-                    indent = "  " * nesting
-                    lines.append(f"{indent}- {text}")
+                    indent = _UNORDERED_INDENTS[nesting]
+                    append(f"{indent}- {text}")
                 prev_was_list = True
             else:
                 if prev_was_list:
                     ordered_counters.clear()
-                    lines.append("")
+                    append("")
                     prev_was_list = False
 
                 style = para.get("paragraphStyle", {})
                 named_style = style.get("namedStyleType", "NORMAL_TEXT")
-                prefix = HEADING_MAP.get(named_style, "")
+                prefix = heading_prefix(named_style, "")
 
                 if prefix:
-                    lines.append(f"{prefix} {text}")
-                    lines.append("")
+                    append(f"{prefix} {text}")
+                    append("")
                 else:
-                    lines.append(text)
-                    lines.append("")
+                    append(text)
+                    append("")
 
         elif "table" in element:
             if prev_was_list:
                 ordered_counters.clear()
-                lines.append("")
+                append("")
                 prev_was_list = False
             table_md = _convert_table(
                 element["table"],
@@ -175,13 +189,13 @@ def _convert_body_to_markdown(doc: dict[str, Any]) -> str:
                 inline_objects=inline_objects,
                 footnote_defs=footnote_defs,
             )
-            lines.append(table_md)
-            lines.append("")
+            append(table_md)
+            append("")
 
     if footnote_defs:
-        lines.append("")
+        append("")
         for fn_id, fn_text in footnote_defs:
-            lines.append(f"[^{fn_id}]: {fn_text}")
+            append(f"[^{fn_id}]: {fn_text}")
 
     result = "\n".join(lines).rstrip("\n") + "\n"
     return result
@@ -195,9 +209,16 @@ def _convert_paragraph_text(
     footnote_defs: list[tuple[str, str]] | None = None,
     active_footnotes: set[str] | None = None,
 ) -> str:
-    """Convert paragraph elements to inline markdown text."""
+    """Convert paragraph elements to stripped inline markdown text."""
+    elements = para.get("elements", [])
+    # Fast path for the common case: a single unstyled text run
+    if len(elements) == 1:
+        text_run = elements[0].get("textRun")
+        if text_run is not None and not text_run.get("textStyle"):
+            return _run_text(text_run).strip()
+
     parts: list[str] = []
-    for elem in para.get("elements", []):
+    for elem in elements:
         if "textRun" in elem:
             parts.append(_convert_text_run(elem["textRun"], skip_strikethrough))
         elif "person" in elem:
@@ -235,17 +256,19 @@ def _convert_text_run(
     text_run: dict[str, Any], skip_strikethrough: bool = False
 ) -> str:
     """Convert a single text run to markdown."""
-    content = text_run.get("content", "")
-    style = text_run.get("textStyle", {})
-
-    text = content.rstrip("\n")
-    # Replace Google Docs Private Use Area chip placeholders (e.g. \ue907)
-    # that appear for unsupported chip types like vote, stopwatch, timer
-    text = text.replace("\ue907", "[Smart Chip]")
+    text = _run_text(text_run)
     if not text:
         return ""
 
-    return _apply_text_style(text, style, skip_strikethrough)
+    return _apply_text_style(text, text_run.get("textStyle", {}), skip_strikethrough)
+
+
+def _run_text(text_run: dict[str, Any]) -> str:
+    """Return a text run's content without its trailing newline."""
+    text = text_run.get("content", "").rstrip("\n")
+    # Replace Google Docs Private Use Area chip placeholders (e.g. \ue907)
+    # that appear for unsupported chip types like vote, stopwatch, timer
+    return text.replace("\ue907", "[Smart Chip]")
 
 
 def _convert_person_chip(person: dict[str, Any]) -> str:
@@ -364,8 +387,8 @@ def _convert_footnote_content(
                 footnote_defs=footnote_defs,
                 active_footnotes=active_footnotes,
             )
-            if text.strip():
-                parts.append(text.strip())
+            if text:
+                parts.append(text)
         elif "table" in element:
             table_text = _convert_table(
                 element["table"],
@@ -400,16 +423,17 @@ def _apply_text_style(
     text: str, style: dict[str, Any], skip_strikethrough: bool = False
 ) -> str:
     """Apply markdown formatting based on text style."""
-    link = style.get("link", {})
-    url = link.get("url")
+    if not style:
+        return text
 
-    font_family = style.get("weightedFontFamily", {}).get("fontFamily", "")
+    font_family = (style.get("weightedFontFamily") or {}).get("fontFamily")
     if font_family in MONO_FONTS:
         return f"`{text}`"
 
-    bold = style.get("bold", False)
-    italic = style.get("italic", False)
-    strikethrough = style.get("strikethrough", False)
+    url = (style.get("link") or {}).get("url")
+    bold = style.get("bold")
+    italic = style.get("italic")
+    strikethrough = style.get("strikethrough")
 
     if bold and italic:
         text = f"***{text}***"
@@ -427,6 +451,15 @@ def _apply_text_style(
     return text
 
 
+def _list_kind(lists_meta: dict[str, Any], list_id: str, nesting: int) -> str:
+    """Classify a list level as "checklist", "ordered" or "bullet"."""
+    if _is_checklist(lists_meta, list_id, nesting):
+        return "checklist"
+    if _is_ordered_list(lists_meta, list_id, nesting):
+        return "ordered"
+    return "bullet"
+
+
 def _is_ordered_list(lists_meta: dict[str, Any], list_id: str, nesting: int) -> bool:
     """Check if a list at a given nesting level is ordered."""
     list_info = lists_meta.get(list_id, {})
@@ -483,22 +516,22 @@ def _convert_table(
         return ""
 
     md_rows: list[str] = []
+    append = md_rows.append
     for i, row in enumerate(rows):
-        cells: list[str] = []
-        for cell in row.get("tableCells", []):
-            cell_text = _extract_cell_text(
+        cells = [
+            _extract_cell_text(
                 cell,
                 footnotes_meta=footnotes_meta,
                 inline_objects=inline_objects,
                 footnote_defs=footnote_defs,
                 active_footnotes=active_footnotes,
             )
-            cells.append(cell_text)
-        md_rows.append("| " + " | ".join(cells) + " |")
+            for cell in row.get("tableCells", [])
+        ]
+        append(f"| {' | '.join(cells)} |")
 
         if i == 0:
-            sep = "| " + " | ".join("---" for _ in cells) + " |"
-            md_rows.append(sep)
+            append(f"| {' | '.join(['---'] * len(cells))} |")
 
     return "\n".join(md_rows)
 
@@ -522,8 +555,8 @@ def _extract_cell_text(
                 footnote_defs=footnote_defs,
                 active_footnotes=active_footnotes,
             )
-            if text.strip():
-                parts.append(text.strip())
+            if text:
+                parts.append(text)
     cell_text = " ".join(parts)
     return cell_text.replace("|", "\\|")
 
@@ -539,17 +572,31 @@ def format_comments_inline(markdown: str, comments: list[dict[str, Any]]) -> str
 
     footnotes: list[str] = []
     unmatched: list[dict[str, Any]] = []
+    # (offset just after the anchor, comment number); anchors are located in
+    # the original text and all references are spliced in with one rebuild
+    insertions: list[tuple[int, int]] = []
 
     for i, comment in enumerate(comments, 1):
-        ref = f"[^c{i}]"
         anchor = comment.get("anchor_text", "")
+        pos = markdown.find(anchor) if anchor else -1
 
-        if anchor and anchor in markdown:
-            markdown = markdown.replace(anchor, anchor + ref, 1)
+        if pos >= 0:
+            insertions.append((pos + len(anchor), i))
             footnotes.append(_format_footnote(i, comment))
         else:
             unmatched.append(comment)
 
+    if insertions:
+        insertions.sort()
+        parts: list[str] = []
+        prev = 0
+        for end, i in insertions:
+            parts.append(markdown[prev:end])
+            parts.append(f"[^c{i}]")
+            prev = end
+        parts.append(markdown[prev:])
+        markdown = "".join(parts)
+
     if footnotes:
         markdown = markdown.rstrip("\n") + "\n\n" + "\n".join(footnotes) + "\n"
 
@@ -602,26 +649,22 @@ def parse_drive_comments(
         List of comment dicts with keys: author, content, anchor_text,
         replies, resolved
     """
-    results = []
-    for comment in response.get("comments", []):
-        if not include_resolved and comment.get("resolved", False):
-            continue
-
-        anchor_text = comment.get("quotedFileContent", {}).get("value", "")
-        replies = [
-            {
-                "author": r.get("author", {}).get("displayName", "Unknown"),
-                "content": r.get("content", ""),
-            }
-            for r in comment.get("replies", [])
-        ]
-        results.append(
-            {
-                "author": comment.get("author", {}).get("displayName", "Unknown"),
-                "content": comment.get("content", ""),
-                "anchor_text": anchor_text,
-                "replies": replies,
-                "resolved": comment.get("resolved", False),
-            }
-        )
-    return results
+    return [
+        {
+            "author": _author_name(comment),
+            "content": comment.get("content", ""),
+            "anchor_text": comment.get("quotedFileContent", {}).get("value", ""),
+            "replies": [
+                {"author": _author_name(r), "content": r.get("content", "")}
+                for r in comment.get("replies", [])
+            ],
+            "resolved": comment.get("resolved", False),
+        }
+        for comment in response.get("comments", [])
+        if include_resolved or not comment.get("resolved", False)
+    ]
+
+
+def _author_name(item: dict[str, Any]) -> str:
+    """Return the display name of a comment or reply author."""
+    return item.get("author", {}).get("displayName", "Unknown")
@@ -6,7 +6,9 @@ extracting validation patterns from individual tool functions.
 """
 
 import logging
-from typing import Dict, Any, List, Tuple, Optional
+import string
+from types import MappingProxyType
+from typing import Dict, Any, List, Mapping, Tuple, Optional
 from urllib.parse import urlparse
 
 from gdocs.docs_helpers import (
@@ -24,6 +26,49 @@ from gdocs.docs_helpers import (
 
 logger = logging.getLogger(__name__)
 
+_HEX_DIGITS = frozenset(string.hexdigits)
+# Matches the character class of the "document_id_pattern" rule
+_DOCUMENT_ID_CHARS = frozenset(string.ascii_letters + string.digits + "-_")
+
+# Shared, read-only validation constraints. Choice values are ordered tuples
+# so error messages list them in a stable order.
+_VALIDATION_RULES: Mapping[str, Any] = MappingProxyType(
+    {
+        "table_max_rows": 1000,
+        "table_max_columns": 20,
+        "document_id_pattern": r"^[a-zA-Z0-9-_]+$",
+        "max_text_length": 1000000,  # 1MB text limit
+        "font_size_range": (1, 400),  # Google Docs font size limits
+        "valid_header_footer_types": ("DEFAULT", "FIRST_PAGE_ONLY", "EVEN_PAGE"),
+        "valid_section_types": ("header", "footer"),
+        "valid_list_types": ("UNORDERED", "ORDERED", "CHECKBOX"),
+        "valid_element_types": ("table", "list", "page_break"),
+        "valid_alignments": ("START", "CENTER", "END", "JUSTIFIED"),
+        "heading_level_range": (0, 6),
+        "font_weight_range": (100, 900),
+    }
+)
+
+# Static parts of ValidationManager.get_validation_summary()
+_SUPPORTED_OPERATIONS: Dict[str, Tuple[str, ...]] = {
+    "table_operations": ("create_table", "populate_table"),
+    "text_operations": (
+        "insert_text",
+        "format_text",
+        "find_replace",
+        "update_paragraph_style",
+        "update_table_cell_style",
+    ),
+    "element_operations": ("insert_table", "insert_list", "insert_page_break"),
+    "header_footer_operations": ("update_header", "update_footer"),
+}
+
+_DATA_FORMATS: Dict[str, str] = {
+    "table_data": "2D list of strings: [['col1', 'col2'], ['row1col1', 'row1col2']]",
+    "text_formatting": "Optional boolean/integer parameters for styling",
+    "document_indices": "Non-negative integers for position specification",
+}
+
 
 class ValidationManager:
     """
@@ -38,22 +83,9 @@ class ValidationManager:
         """Initialize the validation manager."""
         self.validation_rules = self._setup_validation_rules()
 
-    def _setup_validation_rules(self) -> Dict[str, Any]:
+    def _setup_validation_rules(self) -> Mapping[str, Any]:
         """Setup validation rules and constraints."""
-        return {
-            "table_max_rows": 1000,
-            "table_max_columns": 20,
-            "document_id_pattern": r"^[a-zA-Z0-9-_]+$",
-            "max_text_length": 1000000,  # 1MB text limit
-            "font_size_range": (1, 400),  # Google Docs font size limits
-            "valid_header_footer_types": ["DEFAULT", "FIRST_PAGE_ONLY", "EVEN_PAGE"],
-            "valid_section_types": ["header", "footer"],
-            "valid_list_types": ["UNORDERED", "ORDERED", "CHECKBOX"],
-            "valid_element_types": ["table", "list", "page_break"],
-            "valid_alignments": ["START", "CENTER", "END", "JUSTIFIED"],
-            "heading_level_range": (0, 6),
-            "font_weight_range": (100, 900),
-        }
+        return _VALIDATION_RULES
 
     def validate_document_id(self, document_id: str) -> Tuple[bool, str]:
         """
@@ -78,6 +110,13 @@ class ValidationManager:
         if len(document_id) < 20:
             return False, "Document ID appears too short to be valid"
 
+        if not _DOCUMENT_ID_CHARS.issuperset(document_id):
+            return (
+                False,
+                "Document ID contains invalid characters; expected only letters, "
+                "digits, '-' and '_' (pass the ID, not the full document URL)",
+            )
+
         return True, ""
 
     def validate_table_data(self, table_data: List[List[str]]) -> Tuple[bool, str]:
@@ -104,34 +143,44 @@ class ValidationManager:
                 f"Table data must be a list, got {type(table_data).__name__}. Required format: [['col1', 'col2'], ['row1col1', 'row1col2']]",
             )
 
-        # Check if it's a 2D list
-        if not all(isinstance(row, list) for row in table_data):
+        # Check shape in a single pass; the detailed error messages below
+        # rescan the rows only once a problem has been found
+        first_row = table_data[0]
+        cols = len(first_row) if isinstance(first_row, list) else 0
+        well_formed = cols > 0
+        if well_formed:
+            for row in table_data:
+                if not isinstance(row, list) or len(row) != cols:
+                    well_formed = False
+                    break
+
+        if not well_formed:
+            # Check if it's a 2D list
             non_list_rows = [
                 i for i, row in enumerate(table_data) if not isinstance(row, list)
             ]
-            return (
-                False,
-                f"All rows must be lists. Rows {non_list_rows} are not lists. Required format: [['col1', 'col2'], ['row1col1', 'row1col2']]",
-            )
+            if non_list_rows:
+                return (
+                    False,
+                    f"All rows must be lists. Rows {non_list_rows} are not lists. Required format: [['col1', 'col2'], ['row1col1', 'row1col2']]",
+                )
 
-        # Check for empty rows
-        if any(len(row) == 0 for row in table_data):
+            # Check for empty rows
             empty_rows = [i for i, row in enumerate(table_data) if len(row) == 0]
-            return (
-                False,
-                f"Rows cannot be empty. Empty rows found at indices: {empty_rows}",
-            )
+            if empty_rows:
+                return (
+                    False,
+                    f"Rows cannot be empty. Empty rows found at indices: {empty_rows}",
+                )
 
-        # Check column consistency
-        col_counts = [len(row) for row in table_data]
-        if len(set(col_counts)) > 1:
+            # Otherwise the column counts are inconsistent
+            col_counts = [len(row) for row in table_data]
             return (
                 False,
                 f"All rows must have the same number of columns. Found column counts: {col_counts}. Fix your data structure.",
             )
 
         rows = len(table_data)
-        cols = col_counts[0]
 
         # Check dimension limits
         if rows > self.validation_rules["table_max_rows"]:
@@ -197,22 +246,21 @@ class ValidationManager:
             Tuple of (is_valid, error_message)
         """
         # Check if at least one formatting option is provided
-        formatting_params = [
-            bold,
-            italic,
-            underline,
-            strikethrough,
-            font_size,
-            font_family,
-            font_weight,
-            text_color,
-            background_color,
-            link_url,
-            clear_link,
-            baseline_offset,
-            small_caps,
-        ]
-        if all(param is None for param in formatting_params):
+        if (
+            bold is None
+            and italic is None
+            and underline is None
+            and strikethrough is None
+            and font_size is None
+            and font_family is None
+            and font_weight is None
+            and text_color is None
+            and background_color is None
+            and link_url is None
+            and clear_link is None
+            and baseline_offset is None
+            and small_caps is None
+        ):
             return (
                 False,
                 "At least one formatting parameter must be provided (bold, italic, underline, strikethrough, font_size, font_family, font_weight, text_color, background_color, link_url, clear_link, baseline_offset, or small_caps)",
@@ -372,25 +420,24 @@ class ValidationManager:
         Returns:
             Tuple of (is_valid, error_message)
         """
-        style_params = [
-            heading_level,
-            alignment,
-            line_spacing,
-            indent_first_line,
-            indent_start,
-            indent_end,
-            space_above,
-            space_below,
-            named_style_type,
-            direction,
-            keep_lines_together,
-            keep_with_next,
-            avoid_widow_and_orphan,
-            page_break_before,
-            spacing_mode,
-            shading_color,
-        ]
-        if all(param is None for param in style_params):
+        if (
+            heading_level is None
+            and alignment is None
+            and line_spacing is None
+            and indent_first_line is None
+            and indent_start is None
+            and indent_end is None
+            and space_above is None
+            and space_below is None
+            and named_style_type is None
+            and direction is None
+            and keep_lines_together is None
+            and keep_with_next is None
+            and avoid_widow_and_orphan is None
+            and page_break_before is None
+            and spacing_mode is None
+            and shading_color is None
+        ):
             return (
                 False,
                 "At least one paragraph style parameter must be provided (heading_level, alignment, line_spacing, indent_first_line, indent_start, indent_end, space_above, space_below, named_style_type, direction, keep_lines_together, keep_with_next, avoid_widow_and_orphan, page_break_before, spacing_mode, or shading_color)",
@@ -896,8 +943,7 @@ class ValidationManager:
         if len(color) != 7 or not color.startswith("#"):
             return False, f"{param_name} must be a hex string like '#RRGGBB'"
 
-        hex_color = color[1:]
-        if any(c not in "0123456789abcdefABCDEF" for c in hex_color):
+        if not _HEX_DIGITS.issuperset(color[1:]):
             return False, f"{param_name} must be a hex string like '#RRGGBB'"
 
         return True, ""
@@ -1363,25 +1409,6 @@ class ValidationManager:
         """
         return {
             "constraints": self.validation_rules.copy(),
-            "supported_operations": {
-                "table_operations": ["create_table", "populate_table"],
-                "text_operations": [
-                    "insert_text",
-                    "format_text",
-                    "find_replace",
-                    "update_paragraph_style",
-                    "update_table_cell_style",
-                ],
-                "element_operations": [
-                    "insert_table",
-                    "insert_list",
-                    "insert_page_break",
-                ],
-                "header_footer_operations": ["update_header", "update_footer"],
-            },
-            "data_formats": {
-                "table_data": "2D list of strings: [['col1', 'col2'], ['row1col1', 'row1col2']]",
-                "text_formatting": "Optional boolean/integer parameters for styling",
-                "document_indices": "Non-negative integers for position specification",
-            },
+            "supported_operations": dict(_SUPPORTED_OPERATIONS),
+            "data_formats": dict(_DATA_FORMATS),
         }
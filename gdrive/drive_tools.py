@@ -488,12 +488,9 @@ async def get_drive_file_download_url(
     try:
         storage = get_attachment_storage()
 
-        # Encode bytes to base64 (as expected by AttachmentStorage)
-        base64_data = base64.urlsafe_b64encode(file_content_bytes).decode("utf-8")
-
         # Save attachment to local disk
-        result = storage.save_attachment(
-            base64_data=base64_data,
+        result = storage.save_attachment_bytes(
+            data=file_content_bytes,
             filename=output_filename,
             mime_type=output_mime_type,
         )
@@ -0,0 +1,39 @@
+"""Tests for check_credentials_directory_permissions in core.utils."""
+
+import os
+
+import pytest
+
+from core.utils import check_credentials_directory_permissions
+
+
+def test_existing_writable_dir_passes_without_probe_file(tmp_path):
+    check_credentials_directory_permissions(str(tmp_path))
+    assert list(tmp_path.iterdir()) == []
+
+
+def test_missing_dir_is_created(tmp_path):
+    target = tmp_path / "nested" / ".credentials"
+    check_credentials_directory_permissions(str(target))
+    assert target.is_dir()
+    assert list(target.iterdir()) == []
+
+
+def test_falls_back_to_probe_when_access_reports_unwritable(tmp_path, monkeypatch):
+    monkeypatch.setattr(os, "access", lambda *args, **kwargs: False)
+    check_credentials_directory_permissions(str(tmp_path))
+    assert list(tmp_path.iterdir()) == []
+
+
+@pytest.mark.skipif(
+    not hasattr(os, "geteuid") or os.geteuid() == 0,
+    reason="directory permissions are not enforced for root",
+)
+def test_unwritable_dir_raises_permission_error(tmp_path):
+    locked = tmp_path / "locked"
+    locked.mkdir(mode=0o500)
+    try:
+        with pytest.raises(PermissionError, match="Cannot write"):
+            check_credentials_directory_permissions(str(locked))
+    finally:
+        locked.chmod(0o700)
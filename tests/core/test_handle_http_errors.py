@@ -0,0 +1,130 @@
+"""Tests for the handle_http_errors decorator in core.utils."""
+
+import ssl
+from unittest.mock import AsyncMock, MagicMock
+
+import pytest
+from googleapiclient.errors import HttpError
+
+import core.utils as utils_module
+from core.utils import TransientNetworkError, UserInputError, handle_http_errors
+
+
+def _http_error(status: int, content: bytes = b"error") -> HttpError:
+    resp = MagicMock()
+    resp.status = status
+    return HttpError(resp=resp, content=content)
+
+
+@pytest.fixture
+def sleep(monkeypatch):
+    mock_sleep = AsyncMock()
+    monkeypatch.setattr(utils_module.asyncio, "sleep", mock_sleep)
+    return mock_sleep
+
+
+def _failing(*errors, result="ok"):
+    """Return an AsyncMock raising each error in turn, then returning result."""
+    return AsyncMock(side_effect=[*errors, result])
+
+
+@pytest.mark.asyncio
+async def test_returns_result_without_retrying(sleep):
+    func = _failing()
+    wrapped = handle_http_errors("tool")(func)
+    assert await wrapped(user_google_email="u@example.com") == "ok"
+    func.assert_awaited_once()
+    sleep.assert_not_awaited()
+
+
+@pytest.mark.asyncio
+async def test_read_only_retries_ssl_errors_with_backoff(sleep):
+    func = _failing(ssl.SSLError("eof"), ssl.SSLError("eof"))
+    wrapped = handle_http_errors("tool", is_read_only=True)(func)
+    assert await wrapped() == "ok"
+    assert func.await_count == 3
+    assert [c.args[0] for c in sleep.await_args_list] == [1, 2]
+
+
+@pytest.mark.asyncio
+async def test_read_only_ssl_errors_exhaust_retries(sleep):
+    func = AsyncMock(side_effect=ssl.SSLError("eof"))
+    wrapped = handle_http_errors("tool", is_read_only=True)(func)
+    with pytest.raises(TransientNetworkError, match="after 3 attempts"):
+        await wrapped()
+    assert func.await_count == 3
+
+
+@pytest.mark.asyncio
+async def test_write_ssl_error_is_not_retried(sleep):
+    func = _failing(ssl.SSLError("eof"))
+    wrapped = handle_http_errors("tool")(func)
+    with pytest.raises(TransientNetworkError):
+        await wrapped()
+    func.assert_awaited_once()
+    sleep.assert_not_awaited()
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize("is_read_only", [True, False])
+async def test_401_is_retried(sleep, is_read_only):
+    func = _failing(_http_error(401))
+    wrapped = handle_http_errors("tool", is_read_only=is_read_only)(func)
+    assert await wrapped() == "ok"
+    assert func.await_count == 2
+
+
+@pytest.mark.asyncio
+async def test_persistent_401_suggests_reauthentication(sleep, monkeypatch):
+    monkeypatch.setattr(utils_module, "is_oauth21_enabled", lambda: False)
+    func = AsyncMock(side_effect=_http_error(401))
+    wrapped = handle_http_errors("tool")(func)
+    with pytest.raises(Exception, match="re-authenticate for user 'u@example.com'"):
+        await wrapped(user_google_email="u@example.com")
+    assert func.await_count == 3
+
+
+@pytest.mark.asyncio
+async def test_other_http_errors_are_not_retried(sleep):
+    func = _failing(_http_error(400, b"bad request"))
+    wrapped = handle_http_errors("tool")(func)
+    with pytest.raises(Exception, match="API error in tool") as exc_info:
+        await wrapped()
+    assert "re-authenticate" not in str(exc_info.value)
+    assert isinstance(exc_info.value.__cause__, HttpError)
+    func.assert_awaited_once()
+
+
+@pytest.mark.asyncio
+async def test_api_not_enabled_links_to_console(sleep):
+    content = (
+        b'{"error": {"message": "Google Drive API has not been used in project 1 '
+        b'before or it is disabled.", "errors": [{"reason": "accessNotConfigured"}]}}'
+    )
+    wrapped = handle_http_errors("tool", service_type="drive")(
+        _failing(_http_error(403, content))
+    )
+    with pytest.raises(Exception, match="drive.googleapis.com"):
+        await wrapped(user_google_email="u@example.com")
+
+
+@pytest.mark.asyncio
+async def test_user_input_error_passes_through(sleep):
+    wrapped = handle_http_errors("tool")(_failing(UserInputError("bad arg")))
+    with pytest.raises(UserInputError, match="bad arg"):
+        await wrapped()
+
+
+@pytest.mark.asyncio
+async def test_unexpected_error_is_wrapped(sleep):
+    wrapped = handle_http_errors("tool")(_failing(KeyError("boom")))
+    with pytest.raises(Exception, match="unexpected error occurred in tool"):
+        await wrapped()
+
+
+def test_required_scopes_are_propagated():
+    async def tool():
+        return None
+
+    tool._required_google_scopes = ["scope"]
+    assert handle_http_errors("tool")(tool)._required_google_scopes == ["scope"]
@@ -0,0 +1,200 @@
+"""Tests for extract_office_xml_text in core.utils."""
+
+import io
+import zipfile
+
+from core.utils import extract_office_xml_text
+
+DOCX_MIME = "application/vnd.openxmlformats-officedocument.wordprocessingml.document"
+PPTX_MIME = "application/vnd.openxmlformats-officedocument.presentationml.presentation"
+XLSX_MIME = "application/vnd.openxmlformats-officedocument.spreadsheetml.sheet"
+
+W_NS = "http://schemas.openxmlformats.org/wordprocessingml/2006/main"
+A_NS = "http://schemas.openxmlformats.org/drawingml/2006/main"
+P_NS = "http://schemas.openxmlformats.org/presentationml/2006/main"
+S_NS = "http://schemas.openxmlformats.org/spreadsheetml/2006/main"
+
+
+def _make_zip(members: dict) -> bytes:
+    buf = io.BytesIO()
+    with zipfile.ZipFile(buf, "w", zipfile.ZIP_DEFLATED) as zf:
+        for name, content in members.items():
+            zf.writestr(name, content)
+    return buf.getvalue()
+
+
+def _docx(*paragraphs: str) -> bytes:
+    body = "".join(f"<w:p><w:r><w:t>{p}</w:t></w:r></w:p>" for p in paragraphs)
+    xml = f'<w:document xmlns:w="{W_NS}"><w:body>{body}</w:body></w:document>'
+    return _make_zip({"word/document.xml": xml})
+
+
+def _slide(*texts: str) -> str:
+    runs = "".join(f"<a:p><a:r><a:t>{t}</a:t></a:r></a:p>" for t in texts)
+    return (
+        f'<p:sld xmlns:p="{P_NS}" xmlns:a="{A_NS}">'
+        f"<p:cSld><p:spTree><p:sp><p:txBody>{runs}</p:txBody></p:sp></p:spTree>"
+        "</p:cSld></p:sld>"
+    )
+
+
+def _sheet(*cells: str) -> str:
+    return (
+        f'<worksheet xmlns="{S_NS}"><sheetData><row r="1">'
+        + "".join(cells)
+        + "</row></sheetData></worksheet>"
+    )
+
+
+SHARED_STRINGS = (
+    f'<sst xmlns="{S_NS}">'
+    "<si><t>Alpha</t></si>"
+    "<si><r><t>Be</t></r><r><t>ta</t></r></si>"
+    "<si><t/></si>"
+    "</sst>"
+)
+
+
+# ---------------------------------------------------------------------------
+# Word
+# ---------------------------------------------------------------------------
+
+
+def test_docx_extracts_paragraph_text():
+    result = extract_office_xml_text(_docx("Hello", "World"), DOCX_MIME)
+    assert result == "Hello World"
+
+
+def test_docx_skips_whitespace_only_runs():
+    result = extract_office_xml_text(_docx("  Hello  ", "   ", "World"), DOCX_MIME)
+    assert result == "Hello World"
+
+
+def test_docx_ignores_non_text_elements_named_t():
+    xml = (
+        f'<w:document xmlns:w="{W_NS}" xmlns:x="urn:example">'
+        "<w:body><w:p><w:r><w:t>Kept</w:t><x:t>Dropped</x:t></w:r></w:p>"
+        "</w:body></w:document>"
+    )
+    data = _make_zip({"word/document.xml": xml})
+    assert extract_office_xml_text(data, DOCX_MIME) == "Kept"
+
+
+def test_docx_without_text_returns_none():
+    assert extract_office_xml_text(_docx(), DOCX_MIME) is None
+
+
+# ---------------------------------------------------------------------------
+# PowerPoint
+# ---------------------------------------------------------------------------
+
+
+def test_pptx_extracts_each_slide_separately():
+    data = _make_zip(
+        {
+            "ppt/slides/slide1.xml": _slide("Title", "Subtitle"),
+            "ppt/slides/slide2.xml": _slide("Second"),
+            "ppt/slides/_rels/slide1.xml.rels": "<Relationships/>",
+            "ppt/slideLayouts/slideLayout1.xml": _slide("Layout text"),
+        }
+    )
+    result = extract_office_xml_text(data, PPTX_MIME)
+    assert result == "Title Subtitle\n\nSecond"
+
+
+def test_pptx_many_slides_keep_archive_order():
+    slides = {f"ppt/slides/slide{i}.xml": _slide(f"Slide {i}") for i in range(1, 21)}
+    result = extract_office_xml_text(_make_zip(slides), PPTX_MIME)
+    assert result == "\n\n".join(f"Slide {i}" for i in range(1, 21))
+
+
+def test_pptx_bad_slide_xml_does_not_abort_other_slides():
+    data = _make_zip(
+        {
+            "ppt/slides/slide1.xml": "<not-closed>",
+            "ppt/slides/slide2.xml": _slide("Still here"),
+        }
+    )
+    assert extract_office_xml_text(data, PPTX_MIME) == "Still here"
+
+
+# ---------------------------------------------------------------------------
+# Excel
+# ---------------------------------------------------------------------------
+
+
+def test_xlsx_resolves_shared_and_inline_values():
+    data = _make_zip(
+        {
+            "xl/sharedStrings.xml": SHARED_STRINGS,
+            "xl/worksheets/sheet1.xml": _sheet(
+                '<c r="A1" t="s"><v>0</v></c>',
+                '<c r="B1" t="s"><v>1</v></c>',
+                '<c r="C1"><v>42</v></c>',
+                '<c r="D1"/>',
+            ),
+            "xl/worksheets/_rels/sheet1.xml.rels": "<Relationships/>",
+            "xl/drawings/drawing1.xml": "<xdr/>",
+        }
+    )
+    assert extract_office_xml_text(data, XLSX_MIME) == "Alpha Beta 42"
+
+
+def test_xlsx_ignores_bad_shared_string_indexes():
+    data = _make_zip(
+        {
+            "xl/sharedStrings.xml": SHARED_STRINGS,
+            "xl/worksheets/sheet1.xml": _sheet(
+                '<c r="A1" t="s"><v>99</v></c>',
+                '<c r="B1" t="s"><v>nope</v></c>',
+                '<c r="C1" t="s"><v>0</v></c>',
+            ),
+        }
+    )
+    assert extract_office_xml_text(data, XLSX_MIME) == "Alpha"
+
+
+def test_xlsx_truncated_shared_strings_are_discarded():
+    data = _make_zip(
+        {
+            "xl/sharedStrings.xml": SHARED_STRINGS[: SHARED_STRINGS.index("<si><r>")],
+            "xl/worksheets/sheet1.xml": _sheet(
+                '<c r="A1" t="s"><v>0</v></c>', '<c r="B1"><v>5</v></c>'
+            ),
+        }
+    )
+    assert extract_office_xml_text(data, XLSX_MIME) == "5"
+
+
+def test_xlsx_without_shared_strings():
+    data = _make_zip(
+        {
+            "xl/worksheets/sheet1.xml": _sheet('<c r="A1"><v>7</v></c>'),
+            "xl/worksheets/sheet2.xml": _sheet('<c r="A1"><v>8</v></c>'),
+        }
+    )
+    assert extract_office_xml_text(data, XLSX_MIME) == "7\n\n8"
+
+
+# ---------------------------------------------------------------------------
+# Errors and unsupported input
+# ---------------------------------------------------------------------------
+
+
+def test_unsupported_mime_type_returns_none():
+    assert extract_office_xml_text(_docx("Hello"), "application/pdf") is None
+
+
+def test_not_a_zip_returns_none():
+    assert extract_office_xml_text(b"plain bytes", DOCX_MIME) is None
+
+
+def test_entity_expansion_is_rejected():
+    """defusedxml protections stay in place for untrusted documents."""
+    xml = (
+        '<!DOCTYPE d [<!ENTITY a "boom">]>'
+        f'<w:document xmlns:w="{W_NS}"><w:body><w:p><w:r><w:t>&a;</w:t>'
+        "</w:r></w:p></w:body></w:document>"
+    )
+    data = _make_zip({"word/document.xml": xml})
+    assert extract_office_xml_text(data, DOCX_MIME) is None
@@ -0,0 +1,170 @@
+"""Tests for validate_file_path in core.utils."""
+
+import os
+
+import pytest
+
+import core.utils as utils_module
+from core.utils import validate_file_path
+
+
+@pytest.fixture
+def sandbox(tmp_path, monkeypatch):
+    """Point HOME and ALLOWED_FILE_DIRS at temporary directories."""
+    home = tmp_path / "home"
+    allowed = tmp_path / "allowed"
+    outside = tmp_path / "outside"
+    for d in (home, allowed, outside):
+        d.mkdir()
+    monkeypatch.setenv("HOME", str(home))
+    monkeypatch.setenv("ALLOWED_FILE_DIRS", str(allowed))
+    utils_module._invalidate_path_caches()
+    yield {"home": home, "allowed": allowed, "outside": outside}
+    utils_module._invalidate_path_caches()
+
+
+def _touch(path, content=b"data"):
+    path.parent.mkdir(parents=True, exist_ok=True)
+    path.write_bytes(content)
+    return path
+
+
+def test_allows_file_inside_allowed_dir(sandbox):
+    target = _touch(sandbox["allowed"] / "sub" / "report.txt")
+    assert validate_file_path(str(target)) == target.resolve()
+
+
+def test_rejects_file_outside_allowed_dirs(sandbox):
+    target = _touch(sandbox["outside"] / "report.txt")
+    with pytest.raises(ValueError, match="outside permitted directories"):
+        validate_file_path(str(target))
+
+
+def test_rejects_sibling_with_shared_prefix(sandbox):
+    """'/x/allowed-evil' must not pass as being inside '/x/allowed'."""
+    target = _touch(sandbox["allowed"].parent / "allowed-evil" / "a.txt")
+    with pytest.raises(ValueError, match="outside permitted directories"):
+        validate_file_path(str(target))
+
+
+def test_rejects_symlink_escaping_allowed_dir(sandbox):
+    secret = _touch(sandbox["outside"] / "secret.txt")
+    link = sandbox["allowed"] / "link.txt"
+    os.symlink(secret, link)
+    with pytest.raises(ValueError, match="outside permitted directories"):
+        validate_file_path(str(link))
+
+
+def test_missing_file_raises_file_not_found(sandbox):
+    with pytest.raises(FileNotFoundError):
+        validate_file_path(str(sandbox["allowed"] / "nope.txt"))
+
+
+@pytest.mark.parametrize("name", [".env", ".env.local", ".ENV.production"])
+def test_rejects_env_files(sandbox, name):
+    target = _touch(sandbox["allowed"] / name)
+    with pytest.raises(ValueError, match=".env files"):
+        validate_file_path(str(target))
+
+
+@pytest.mark.parametrize(
+    "name", ["credentials.json", "client_secret.json", ".netrc", ".npmrc"]
+)
+def test_rejects_credential_file_names(sandbox, name):
+    target = _touch(sandbox["allowed"] / name)
+    with pytest.raises(ValueError, match="commonly contains secrets"):
+        validate_file_path(str(target))
+
+
+@pytest.mark.parametrize("sensitive_dir", [".ssh", ".aws", ".config/gcloud"])
+def test_rejects_sensitive_home_dirs(sandbox, monkeypatch, sensitive_dir):
+    monkeypatch.setenv("ALLOWED_FILE_DIRS", str(sandbox["home"]))
+    utils_module._invalidate_path_caches()
+    target = _touch(sandbox["home"] / sensitive_dir / "id_key")
+    with pytest.raises(ValueError, match="secrets or credentials"):
+        validate_file_path(str(target))
+
+
+def test_rejects_system_locations(sandbox, monkeypatch):
+    monkeypatch.setenv("ALLOWED_FILE_DIRS", "/")
+    utils_module._invalidate_path_caches()
+    with pytest.raises(ValueError, match="restricted system location"):
+        validate_file_path("/proc/self/status")
+
+
+def test_defaults_to_home_when_env_unset(sandbox, monkeypatch):
+    monkeypatch.delenv("ALLOWED_FILE_DIRS")
+    utils_module._invalidate_path_caches()
+    inside = _touch(sandbox["home"] / "notes.txt")
+    outside = _touch(sandbox["allowed"] / "notes.txt")
+
+    assert validate_file_path(str(inside)) == inside.resolve()
+    with pytest.raises(ValueError, match="outside permitted directories"):
+        validate_file_path(str(outside))
+
+
+def test_allowed_dirs_follow_env_changes(sandbox, monkeypatch):
+    target = _touch(sandbox["outside"] / "later.txt")
+    with pytest.raises(ValueError):
+        validate_file_path(str(target))
+
+    monkeypatch.setenv(
+        "ALLOWED_FILE_DIRS",
+        os.pathsep.join([str(sandbox["allowed"]), str(sandbox["outside"])]),
+    )
+    assert validate_file_path(str(target)) == target.resolve()
+
+
+def test_rejects_file_reached_through_symlinked_ssh_dir(sandbox, monkeypatch):
+    """A ~/.ssh symlink must not let its target escape the block list."""
+    real_keys = sandbox["outside"] / "keys"
+    _touch(real_keys / "id_key")
+    os.symlink(real_keys, sandbox["home"] / ".ssh")
+    monkeypatch.setenv("ALLOWED_FILE_DIRS", str(sandbox["outside"]))
+    utils_module._invalidate_path_caches()
+    with pytest.raises(ValueError, match="secrets or credentials"):
+        validate_file_path(str(sandbox["home"] / ".ssh" / "id_key"))
+
+
+def test_filesystem_root_as_allowed_dir(sandbox, monkeypatch):
+    monkeypatch.setenv("ALLOWED_FILE_DIRS", os.sep)
+    utils_module._invalidate_path_caches()
+    target = _touch(sandbox["outside"] / "anywhere.txt")
+    assert validate_file_path(str(target)) == target.resolve()
+
+
+def test_sensitive_name_rejected_without_touching_filesystem(sandbox):
+    """Name-based rejections do not depend on the file existing."""
+    with pytest.raises(ValueError, match=".env files"):
+        validate_file_path(str(sandbox["allowed"] / "missing" / ".env"))
+
+
+def test_symlink_to_sensitive_name_is_rejected(sandbox):
+    secret = _touch(sandbox["allowed"] / "credentials.json")
+    link = sandbox["allowed"] / "harmless.txt"
+    os.symlink(secret, link)
+    with pytest.raises(ValueError, match="commonly contains secrets"):
+        validate_file_path(str(link))
+
+
+def test_expands_user_home(sandbox, monkeypatch):
+    monkeypatch.setenv("ALLOWED_FILE_DIRS", str(sandbox["home"]))
+    utils_module._invalidate_path_caches()
+    target = _touch(sandbox["home"] / "notes.txt")
+    assert validate_file_path("~/notes.txt") == target.resolve()
+
+
+def test_symlink_loop_raises_value_error(sandbox):
+    loop = sandbox["allowed"] / "loop"
+    os.symlink(loop, loop)
+    with pytest.raises(ValueError, match="could not be resolved"):
+        validate_file_path(str(loop))
+
+
+def test_unresolvable_path_raises_value_error(sandbox, monkeypatch):
+    def denied(path, strict=False):
+        raise PermissionError(13, "Permission denied", path)
+
+    monkeypatch.setattr(utils_module.os.path, "realpath", denied)
+    with pytest.raises(ValueError, match="Permission denied"):
+        validate_file_path(str(sandbox["allowed"] / "report.txt"))
@@ -6,6 +6,8 @@ import asyncio
 import base64
 import inspect
 import ssl
+import tempfile
+import time
 from urllib.parse import urlparse
 
 import pytest
@@ -54,6 +56,87 @@ def _unwrap(tool):
     return fn
 
 
+def _mock_stream_client(body, status_code=200, chunk_size=4):
+    """Build a mock download client whose stream() yields body in chunks."""
+    response = Mock()
+    response.status_code = status_code
+    response.text = body.decode("utf-8", errors="replace")
+    response.aread = AsyncMock(return_value=body)
+
+    async def aiter_bytes(*_args):
+        for i in range(0, len(body), chunk_size):
+            yield body[i : i + chunk_size]
+
+    response.aiter_bytes = aiter_bytes
+
+    stream_cm = AsyncMock()
+    stream_cm.__aenter__.return_value = response
+    stream_cm.__aexit__.return_value = False
+
+    client = Mock()
+    client.stream = Mock(return_value=stream_cm)
+    return client
+
+
+def _mock_storage(mock_get_storage, tmp_path, saved):
+    """Give the patched storage a real temp file and record what gets saved."""
+    storage = mock_get_storage.return_value
+    storage.create_temp_file.side_effect = lambda: tempfile.mkstemp(dir=tmp_path)
+
+    def save_from_path(source_path, filename=None, mime_type=None):
+        with open(source_path, "rb") as f:
+            storage.saved_bytes = f.read()
+        return saved
+
+    storage.save_attachment_from_path.side_effect = save_from_path
+    return storage
+
+
+@pytest.mark.asyncio
+async def test_run_gapi_uses_dedicated_executor():
+    import threading
+
+    from gchat.chat_tools import _run_gapi
+
+    name = await _run_gapi(lambda: threading.current_thread().name)
+
+    assert name.startswith("gchat-api")
+
+
+# ---------------------------------------------------------------------------
+# list_spaces: space_type filter
+# ---------------------------------------------------------------------------
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize(
+    "space_type,expected_filter",
+    [
+        ("room", "spaceType = SPACE"),
+        ("dm", "spaceType = DIRECT_MESSAGE"),
+        ("all", None),
+    ],
+)
+async def test_list_spaces_maps_space_type_to_filter(space_type, expected_filter):
+    service = Mock()
+    service.spaces().list.return_value.execute.return_value = {
+        "spaces": [
+            {"name": "spaces/S", "displayName": "Team", "spaceType": "SPACE"},
+        ]
+    }
+
+    from gchat.chat_tools import list_spaces
+
+    result = await _unwrap(list_spaces)(
+        service=service, user_google_email="test@example.com", space_type=space_type
+    )
+
+    call_kwargs = service.spaces().list.call_args.kwargs
+    assert call_kwargs.get("filter") == expected_filter
+    assert call_kwargs["pageSize"] == 100
+    assert "- Team (ID: spaces/S, Type: SPACE)" in result
+
+
 # ---------------------------------------------------------------------------
 # get_messages: attachment metadata appears in output
 # ---------------------------------------------------------------------------
@@ -182,6 +265,145 @@ async def test_get_messages_exposes_message_filter_and_forwards_it(mock_resolve)
     assert list_kwargs["filter"] == "thread.name = spaces/S/threads/T"
 
 
+@pytest.mark.asyncio
+async def test_get_messages_formats_links_threads_and_reactions():
+    msg = _make_message(text="See doc")
+    msg["annotations"] = [
+        {
+            "type": "RICH_LINK",
+            "richLinkMetadata": {"uri": "https://docs.google.com/d/1"},
+        }
+    ]
+    msg["threadReply"] = True
+    msg["thread"] = {"name": "spaces/S/threads/T"}
+    msg["emojiReactionSummaries"] = [
+        {"emoji": {"unicode": "👍"}, "reactionCount": 2},
+        {"emoji": {"customEmoji": {"uid": "party"}}, "reactionCount": 1},
+    ]
+
+    chat_service = Mock()
+    chat_service.spaces().get().execute.return_value = {"displayName": "Test Space"}
+    chat_service.spaces().messages().list().execute.return_value = {"messages": [msg]}
+
+    from gchat.chat_tools import get_messages
+
+    result = await _unwrap(get_messages)(
+        chat_service=chat_service,
+        people_service=Mock(),
+        user_google_email="test@example.com",
+        space_id="spaces/S",
+    )
+
+    assert result == (
+        "Messages from 'Test Space' (ID: spaces/S):\n\n"
+        "[2025-01-01T00:00:00Z] Test User:\n"
+        "  See doc\n"
+        "  [linked: https://docs.google.com/d/1]\n"
+        "  [thread: spaces/S/threads/T]\n"
+        "  [reactions: 👍x2, :party:x1]\n"
+        "  (Message ID: spaces/S/messages/M)\n"
+    )
+
+
+@pytest.mark.asyncio
+async def test_get_messages_never_overlaps_chat_service_calls(monkeypatch):
+    """The shared httplib2 transport is not thread-safe."""
+    in_flight = 0
+    peak = 0
+
+    async def tracking_to_thread(fn, *args, **kwargs):
+        nonlocal in_flight, peak
+        in_flight += 1
+        peak = max(peak, in_flight)
+        await asyncio.sleep(0.01)
+        in_flight -= 1
+        return fn(*args, **kwargs)
+
+    monkeypatch.setattr("gchat.chat_tools._run_gapi", tracking_to_thread)
+
+    chat_service = Mock()
+    chat_service.spaces().get().execute.return_value = {"displayName": "Test Space"}
+    chat_service.spaces().messages().list().execute.return_value = {
+        "messages": [_make_message()]
+    }
+
+    from gchat.chat_tools import get_messages
+
+    result = await _unwrap(get_messages)(
+        chat_service=chat_service,
+        people_service=Mock(),
+        user_google_email="test@example.com",
+        space_id="spaces/S",
+    )
+
+    assert peak == 1
+    assert "Messages from 'Test Space'" in result
+
+
+@pytest.mark.asyncio
+@patch("gchat.chat_tools._resolve_senders_batch", new_callable=AsyncMock)
+@patch("gchat.chat_tools._resolve_sender", new_callable=AsyncMock)
+async def test_get_messages_labels_senders_from_batch_only(mock_resolve, mock_batch):
+    mock_batch.return_value = {"users/1": "Ada"}
+    messages = [
+        {"name": "spaces/S/messages/1", "sender": {"name": "users/1"}},
+        {"name": "spaces/S/messages/2", "sender": {"displayName": "Bot"}},
+        {"name": "spaces/S/messages/3"},
+    ]
+    chat_service = Mock()
+    chat_service.spaces().get().execute.return_value = {"displayName": "Test Space"}
+    chat_service.spaces().messages().list().execute.return_value = {
+        "messages": messages
+    }
+
+    from gchat.chat_tools import get_messages
+
+    result = await _unwrap(get_messages)(
+        chat_service=chat_service,
+        people_service=Mock(),
+        user_google_email="test@example.com",
+        space_id="spaces/S",
+    )
+
+    assert "] Ada:" in result
+    assert "] Bot:" in result
+    assert "] Unknown Sender:" in result
+    mock_batch.assert_awaited_once()
+    mock_resolve.assert_not_awaited()
+
+
+@pytest.mark.parametrize(
+    "reaction,expected",
+    [
+        ({"emoji": {"unicode": "🎉"}, "reactionCount": 3}, "🎉x3"),
+        ({"emoji": {"customEmoji": {"uid": "party"}}}, ":party:x0"),
+        ({"emoji": None, "reactionCount": 1}, ":?:x1"),
+    ],
+)
+def test_format_reaction(reaction, expected):
+    from gchat.chat_tools import _format_reaction
+
+    assert _format_reaction(reaction) == expected
+
+
+def test_extract_rich_links_skips_urls_already_in_text():
+    from gchat.chat_tools import _extract_rich_links
+
+    msg = {
+        "text": "see https://a.example",
+        "annotations": [
+            {"type": "RICH_LINK", "richLinkMetadata": {"uri": "https://a.example"}},
+            {"type": "RICH_LINK", "richLinkMetadata": {"uri": "https://b.example"}},
+            {"type": "RICH_LINK", "richLinkMetadata": None},
+            {"type": "RICH_LINK"},
+            {"type": "USER_MENTION"},
+        ],
+    }
+
+    assert _extract_rich_links(msg) == ["https://b.example"]
+    assert _extract_rich_links({"text": "no annotations"}) == []
+
+
 # ---------------------------------------------------------------------------
 # search_messages: attachment indicator
 # ---------------------------------------------------------------------------
@@ -308,7 +530,7 @@ async def test_search_messages_limits_parallel_space_fetches(mock_resolve, monke
         finally:
             state["current"] -= 1
 
-    monkeypatch.setattr("gchat.chat_tools.asyncio.to_thread", fake_to_thread)
+    monkeypatch.setattr("gchat.chat_tools._run_gapi", fake_to_thread)
 
     spaces = [{"name": f"spaces/S{i}", "displayName": f"Space {i}"} for i in range(5)]
 
@@ -348,7 +570,7 @@ async def test_search_messages_retries_ssl_per_space_without_restarting_search(
     async def fake_to_thread(fn, *args, **kwargs):
         return fn(*args, **kwargs)
 
-    monkeypatch.setattr("gchat.chat_tools.asyncio.to_thread", fake_to_thread)
+    monkeypatch.setattr("gchat.chat_tools._run_gapi", fake_to_thread)
     monkeypatch.setattr("gchat.chat_tools.asyncio.sleep", AsyncMock())
 
     from gchat.chat_tools import search_messages
@@ -402,7 +624,7 @@ async def test_search_messages_raises_transient_error_when_all_spaces_ssl_fail(
     async def fake_to_thread(fn, *args, **kwargs):
         return fn(*args, **kwargs)
 
-    monkeypatch.setattr("gchat.chat_tools.asyncio.to_thread", fake_to_thread)
+    monkeypatch.setattr("gchat.chat_tools._run_gapi", fake_to_thread)
     monkeypatch.setattr("gchat.chat_tools.asyncio.sleep", AsyncMock())
 
     from core.utils import TransientNetworkError
@@ -434,6 +656,120 @@ async def test_search_messages_raises_transient_error_when_all_spaces_ssl_fail(
 # ---------------------------------------------------------------------------
 
 
+@pytest.mark.asyncio
+async def test_download_client_is_reused_within_event_loop(monkeypatch):
+    import gchat.chat_tools as chat_tools
+
+    monkeypatch.setattr(chat_tools, "_download_client", None)
+    monkeypatch.setattr(chat_tools, "_download_client_loop", None)
+
+    client = chat_tools._get_download_client()
+    try:
+        assert chat_tools._get_download_client() is client
+    finally:
+        await client.aclose()
+
+
+def test_download_client_from_previous_loop_is_closed(monkeypatch):
+    import gchat.chat_tools as chat_tools
+
+    monkeypatch.setattr(chat_tools, "_download_client", None)
+    monkeypatch.setattr(chat_tools, "_download_client_loop", None)
+
+    async def get_client():
+        return chat_tools._get_download_client()
+
+    first = asyncio.run(get_client())
+
+    async def replace_and_settle():
+        client = chat_tools._get_download_client()
+        await asyncio.sleep(0)
+        await client.aclose()
+        return client
+
+    second = asyncio.run(replace_and_settle())
+
+    assert second is not first
+    assert first.is_closed
+
+
+@pytest.mark.asyncio
+async def test_download_client_is_closed_on_server_shutdown(monkeypatch):
+    import gchat.chat_tools as chat_tools
+    from core.server import server
+
+    monkeypatch.setattr(chat_tools, "_download_client", None)
+    monkeypatch.setattr(chat_tools, "_download_client_loop", None)
+
+    async with server._lifespan_manager():
+        client = chat_tools._get_download_client()
+
+    assert client.is_closed
+    assert chat_tools._download_client is None
+
+
+@pytest.mark.asyncio
+async def test_bearer_token_refreshes_expired_credentials_once():
+    from gchat.chat_tools import _bearer_token
+
+    class FakeCredentials:
+        def __init__(self):
+            self.expired = True
+            self.refresh_token = "refresh"
+            self.token = "stale"
+            self.refresh_calls = 0
+
+        def refresh(self, request):
+            self.refresh_calls += 1
+            self.token = "fresh"
+            self.expired = False
+
+    service = Mock()
+    service._http.credentials = FakeCredentials()
+
+    tokens = await asyncio.gather(*(_bearer_token(service) for _ in range(5)))
+
+    assert tokens == ["fresh"] * 5
+    assert service._http.credentials.refresh_calls == 1
+
+
+def test_bearer_token_refresh_works_across_event_loops():
+    from gchat.chat_tools import _bearer_token
+
+    class FakeCredentials:
+        def __init__(self):
+            self.expired = True
+            self.refresh_token = "refresh"
+            self.token = "stale"
+
+        def refresh(self, request):
+            time.sleep(0.05)  # keep the lock held so the other callers wait on it
+            self.token = "fresh"
+            self.expired = False
+
+    async def refresh_concurrently():
+        service = Mock()
+        service._http.credentials = FakeCredentials()
+        return await asyncio.gather(*(_bearer_token(service) for _ in range(3)))
+
+    # Each asyncio.run uses a new loop; a lock bound to the first must not leak
+    assert asyncio.run(refresh_concurrently()) == ["fresh"] * 3
+    assert asyncio.run(refresh_concurrently()) == ["fresh"] * 3
+
+
+@pytest.mark.asyncio
+async def test_bearer_token_without_refresh_token_returns_current_token():
+    from gchat.chat_tools import _bearer_token
+
+    service = Mock()
+    service._http.credentials.expired = True
+    service._http.credentials.refresh_token = None
+    service._http.credentials.token = "oauth21-token"
+
+    assert await _bearer_token(service) == "oauth21-token"
+    service._http.credentials.refresh.assert_not_called()
+
+
 @pytest.mark.asyncio
 async def test_download_no_attachments():
     """Should return a clear message when the message has no attachments."""
@@ -472,7 +808,7 @@ async def test_download_invalid_index():
 
 
 @pytest.mark.asyncio
-async def test_download_uses_api_media_endpoint():
+async def test_download_uses_api_media_endpoint(tmp_path):
     """Should always use chat.googleapis.com media endpoint, not downloadUri."""
     fake_bytes = b"fake image content"
     att = _make_attachment()
@@ -490,22 +826,15 @@ async def test_download_uses_api_media_endpoint():
     saved.path = "/tmp/image_abc.png"
     saved.file_id = "abc"
 
-    mock_response = Mock()
-    mock_response.content = fake_bytes
-    mock_response.status_code = 200
-
-    mock_client = AsyncMock()
-    mock_client.get.return_value = mock_response
-    mock_client.__aenter__ = AsyncMock(return_value=mock_client)
-    mock_client.__aexit__ = AsyncMock(return_value=False)
+    mock_client = _mock_stream_client(fake_bytes)
 
     with (
-        patch("gchat.chat_tools.httpx.AsyncClient", return_value=mock_client),
-        patch("auth.oauth_config.is_stateless_mode", return_value=False),
-        patch("core.config.get_transport_mode", return_value="stdio"),
-        patch("core.attachment_storage.get_attachment_storage") as mock_get_storage,
+        patch("gchat.chat_tools._get_download_client", return_value=mock_client),
+        patch("gchat.chat_tools.is_stateless_mode", return_value=False),
+        patch("gchat.chat_tools.get_transport_mode", return_value="stdio"),
+        patch("gchat.chat_tools.get_attachment_storage") as mock_get_storage,
     ):
-        mock_get_storage.return_value.save_attachment.return_value = saved
+        storage = _mock_storage(mock_get_storage, tmp_path, saved)
 
         result = await _unwrap(download_chat_attachment)(
             service=service,
@@ -519,8 +848,9 @@ async def test_download_uses_api_media_endpoint():
     assert "Saved to:" in result
 
     # Verify we used the API endpoint with attachmentDataRef.resourceName
-    call_args = mock_client.get.call_args
-    url_used = call_args.args[0]
+    call_args = mock_client.stream.call_args
+    assert call_args.args[0] == "GET"
+    url_used = call_args.args[1]
     parsed = urlparse(url_used)
     assert parsed.scheme == "https"
     assert parsed.hostname == "chat.googleapis.com"
@@ -531,16 +861,16 @@ async def test_download_uses_api_media_endpoint():
     # Verify Bearer token
     assert call_args.kwargs["headers"]["Authorization"] == "Bearer fake-access-token"
 
-    # Verify save_attachment was called with correct base64 data
-    save_args = mock_get_storage.return_value.save_attachment.call_args
+    # Verify the streamed body was handed to storage as a file
+    save_args = storage.save_attachment_from_path.call_args
     assert save_args.kwargs["filename"] == "image.png"
     assert save_args.kwargs["mime_type"] == "image/png"
-    decoded = base64.urlsafe_b64decode(save_args.kwargs["base64_data"])
-    assert decoded == fake_bytes
+    assert storage.saved_bytes == fake_bytes
+    storage.save_attachment.assert_not_called()
 
 
 @pytest.mark.asyncio
-async def test_download_falls_back_to_att_name():
+async def test_download_falls_back_to_att_name(tmp_path):
     """When attachmentDataRef is missing, should fall back to attachment name."""
     fake_bytes = b"fetched content"
     att = _make_attachment(name="spaces/S/messages/M/attachments/A", resource_name=None)
@@ -554,24 +884,17 @@ async def test_download_falls_back_to_att_name():
     saved.path = "/tmp/image_fetched.png"
     saved.file_id = "f1"
 
-    mock_response = Mock()
-    mock_response.content = fake_bytes
-    mock_response.status_code = 200
-
-    mock_client = AsyncMock()
-    mock_client.get.return_value = mock_response
-    mock_client.__aenter__ = AsyncMock(return_value=mock_client)
-    mock_client.__aexit__ = AsyncMock(return_value=False)
+    mock_client = _mock_stream_client(fake_bytes)
 
     from gchat.chat_tools import download_chat_attachment
 
     with (
-        patch("gchat.chat_tools.httpx.AsyncClient", return_value=mock_client),
-        patch("auth.oauth_config.is_stateless_mode", return_value=False),
-        patch("core.config.get_transport_mode", return_value="stdio"),
-        patch("core.attachment_storage.get_attachment_storage") as mock_get_storage,
+        patch("gchat.chat_tools._get_download_client", return_value=mock_client),
+        patch("gchat.chat_tools.is_stateless_mode", return_value=False),
+        patch("gchat.chat_tools.get_transport_mode", return_value="stdio"),
+        patch("gchat.chat_tools.get_attachment_storage") as mock_get_storage,
     ):
-        mock_get_storage.return_value.save_attachment.return_value = saved
+        storage = _mock_storage(mock_get_storage, tmp_path, saved)
 
         result = await _unwrap(download_chat_attachment)(
             service=service,
@@ -584,12 +907,14 @@ async def test_download_falls_back_to_att_name():
     assert "/tmp/image_fetched.png" in result
 
     # Falls back to attachment name when no attachmentDataRef
-    call_args = mock_client.get.call_args
-    assert "spaces/S/messages/M/attachments/A" in call_args.args[0]
+    call_args = mock_client.stream.call_args
+    assert "spaces/S/messages/M/attachments/A" in call_args.args[1]
+    storage.save_attachment_from_path.assert_called_once()
+    assert storage.saved_bytes == fake_bytes
 
 
 @pytest.mark.asyncio
-async def test_download_http_mode_returns_url():
+async def test_download_http_mode_returns_url(tmp_path):
     """In HTTP mode, should return a download URL instead of file path."""
     fake_bytes = b"image data"
     att = _make_attachment()
@@ -599,14 +924,7 @@ async def test_download_http_mode_returns_url():
     service.spaces().messages().get().execute.return_value = msg
     service._http.credentials.token = "fake-token"
 
-    mock_response = Mock()
-    mock_response.content = fake_bytes
-    mock_response.status_code = 200
-
-    mock_client = AsyncMock()
-    mock_client.get.return_value = mock_response
-    mock_client.__aenter__ = AsyncMock(return_value=mock_client)
-    mock_client.__aexit__ = AsyncMock(return_value=False)
+    mock_client = _mock_stream_client(fake_bytes)
 
     saved = Mock()
     saved.path = "/tmp/image_alt.png"
@@ -615,16 +933,16 @@ async def test_download_http_mode_returns_url():
     from gchat.chat_tools import download_chat_attachment
 
     with (
-        patch("gchat.chat_tools.httpx.AsyncClient", return_value=mock_client),
-        patch("auth.oauth_config.is_stateless_mode", return_value=False),
-        patch("core.config.get_transport_mode", return_value="http"),
-        patch("core.attachment_storage.get_attachment_storage") as mock_get_storage,
+        patch("gchat.chat_tools._get_download_client", return_value=mock_client),
+        patch("gchat.chat_tools.is_stateless_mode", return_value=False),
+        patch("gchat.chat_tools.get_transport_mode", return_value="http"),
+        patch("gchat.chat_tools.get_attachment_storage") as mock_get_storage,
         patch(
-            "core.attachment_storage.get_attachment_url",
+            "gchat.chat_tools.get_attachment_url",
             return_value="http://localhost:8005/attachments/alt1",
         ),
     ):
-        mock_get_storage.return_value.save_attachment.return_value = saved
+        storage = _mock_storage(mock_get_storage, tmp_path, saved)
 
         result = await _unwrap(download_chat_attachment)(
             service=service,
@@ -635,6 +953,7 @@ async def test_download_http_mode_returns_url():
 
     assert "Download URL:" in result
     assert "expire after 1 hour" in result
+    storage.save_attachment_from_path.assert_called_once()
 
 
 @pytest.mark.asyncio
@@ -648,14 +967,12 @@ async def test_download_returns_error_on_failure():
     service.spaces().messages().get().execute.return_value = msg
     service._http.credentials.token = "fake-token"
 
-    mock_client = AsyncMock()
-    mock_client.get.side_effect = Exception("connection refused")
-    mock_client.__aenter__ = AsyncMock(return_value=mock_client)
-    mock_client.__aexit__ = AsyncMock(return_value=False)
+    mock_client = _mock_stream_client(b"")
+    mock_client.stream.side_effect = Exception("connection refused")
 
     from gchat.chat_tools import download_chat_attachment
 
-    with patch("gchat.chat_tools.httpx.AsyncClient", return_value=mock_client):
+    with patch("gchat.chat_tools._get_download_client", return_value=mock_client):
         result = await _unwrap(download_chat_attachment)(
             service=service,
             user_google_email="test@example.com",
@@ -665,3 +982,440 @@ async def test_download_returns_error_on_failure():
 
     assert "Failed to download" in result
     assert "connection refused" in result
+
+
+@pytest.mark.asyncio
+async def test_download_reports_http_error_status():
+    att = _make_attachment()
+    msg = _make_message(attachments=[att])
+
+    service = Mock()
+    service.spaces().messages().get().execute.return_value = msg
+    service._http.credentials.token = "fake-token"
+
+    mock_client = _mock_stream_client(b"forbidden", status_code=403)
+
+    from gchat.chat_tools import download_chat_attachment
+
+    with (
+        patch("gchat.chat_tools._get_download_client", return_value=mock_client),
+        patch("gchat.chat_tools.is_stateless_mode", return_value=False),
+        patch("gchat.chat_tools.get_attachment_storage") as mock_get_storage,
+    ):
+        result = await _unwrap(download_chat_attachment)(
+            service=service,
+            user_google_email="test@example.com",
+            message_id="spaces/S/messages/M",
+            attachment_index=0,
+        )
+
+    assert "HTTP 403" in result
+    assert "forbidden" in result
+    mock_get_storage.return_value.create_temp_file.assert_not_called()
+
+
+@pytest.mark.asyncio
+async def test_download_removes_partial_file_when_stream_fails(tmp_path):
+    att = _make_attachment()
+    msg = _make_message(attachments=[att])
+
+    service = Mock()
+    service.spaces().messages().get().execute.return_value = msg
+    service._http.credentials.token = "fake-token"
+
+    mock_client = _mock_stream_client(b"")
+    response = mock_client.stream.return_value.__aenter__.return_value
+
+    async def broken_stream(*_args):
+        yield b"partial"
+        raise Exception("connection reset")
+
+    response.aiter_bytes = broken_stream
+
+    from gchat.chat_tools import download_chat_attachment
+
+    with (
+        patch("gchat.chat_tools._get_download_client", return_value=mock_client),
+        patch("gchat.chat_tools.is_stateless_mode", return_value=False),
+        patch("gchat.chat_tools.get_attachment_storage") as mock_get_storage,
+    ):
+        storage = _mock_storage(mock_get_storage, tmp_path, Mock())
+        result = await _unwrap(download_chat_attachment)(
+            service=service,
+            user_google_email="test@example.com",
+            message_id="spaces/S/messages/M",
+            attachment_index=0,
+        )
+
+    assert "connection reset" in result
+    assert list(tmp_path.iterdir()) == []
+    storage.save_attachment_from_path.assert_not_called()
+
+
+@pytest.mark.asyncio
+async def test_download_removes_temp_file_when_save_fails(tmp_path):
+    att = _make_attachment()
+    msg = _make_message(attachments=[att])
+
+    service = Mock()
+    service.spaces().messages().get().execute.return_value = msg
+    service._http.credentials.token = "fake-token"
+
+    from gchat.chat_tools import download_chat_attachment
+
+    with (
+        patch(
+            "gchat.chat_tools._get_download_client",
+            return_value=_mock_stream_client(b"content"),
+        ),
+        patch("gchat.chat_tools.is_stateless_mode", return_value=False),
+        patch("gchat.chat_tools.get_attachment_storage") as mock_get_storage,
+    ):
+        storage = _mock_storage(mock_get_storage, tmp_path, Mock())
+        storage.save_attachment_from_path.side_effect = OSError("disk full")
+        with pytest.raises(OSError, match="disk full"):
+            await _unwrap(download_chat_attachment)(
+                service=service,
+                user_google_email="test@example.com",
+                message_id="spaces/S/messages/M",
+                attachment_index=0,
+            )
+
+    assert list(tmp_path.iterdir()) == []
+
+
+@pytest.mark.asyncio
+async def test_download_removes_temp_file_when_cancelled(tmp_path):
+    att = _make_attachment()
+    msg = _make_message(attachments=[att])
+
+    service = Mock()
+    service.spaces().messages().get().execute.return_value = msg
+    service._http.credentials.token = "fake-token"
+
+    mock_client = _mock_stream_client(b"")
+    response = mock_client.stream.return_value.__aenter__.return_value
+
+    async def cancelled_stream(*_args):
+        yield b"partial"
+        raise asyncio.CancelledError()
+
+    response.aiter_bytes = cancelled_stream
+
+    from gchat.chat_tools import download_chat_attachment
+
+    with (
+        patch("gchat.chat_tools._get_download_client", return_value=mock_client),
+        patch("gchat.chat_tools.is_stateless_mode", return_value=False),
+        patch("gchat.chat_tools.get_attachment_storage") as mock_get_storage,
+    ):
+        storage = _mock_storage(mock_get_storage, tmp_path, Mock())
+        with pytest.raises(asyncio.CancelledError):
+            await _unwrap(download_chat_attachment)(
+                service=service,
+                user_google_email="test@example.com",
+                message_id="spaces/S/messages/M",
+                attachment_index=0,
+            )
+
+    assert list(tmp_path.iterdir()) == []
+    storage.save_attachment_from_path.assert_not_called()
+
+
+@pytest.mark.asyncio
+async def test_download_stateless_mode_returns_preview_only():
+    fake_bytes = bytes(range(256)) * 4
+    att = _make_attachment()
+    msg = _make_message(attachments=[att])
+
+    service = Mock()
+    service.spaces().messages().get().execute.return_value = msg
+    service._http.credentials.token = "fake-token"
+
+    mock_client = _mock_stream_client(fake_bytes, chunk_size=64)
+
+    from gchat.chat_tools import download_chat_attachment
+
+    with (
+        patch("gchat.chat_tools._get_download_client", return_value=mock_client),
+        patch("gchat.chat_tools.is_stateless_mode", return_value=True),
+        patch("gchat.chat_tools.get_attachment_storage") as mock_get_storage,
+    ):
+        result = await _unwrap(download_chat_attachment)(
+            service=service,
+            user_google_email="test@example.com",
+            message_id="spaces/S/messages/M",
+            attachment_index=0,
+        )
+
+    expected_preview = base64.urlsafe_b64encode(fake_bytes).decode("utf-8")[:100]
+    assert f"Base64 preview: {expected_preview}..." in result
+    assert "(1024 bytes)" in result
+    mock_get_storage.assert_not_called()
+
+
+# ---------------------------------------------------------------------------
+# Sender name cache
+# ---------------------------------------------------------------------------
+
+
+@pytest.fixture
+def sender_cache(monkeypatch):
+    """Give each test an empty sender cache with a small capacity."""
+    from collections import OrderedDict
+
+    import gchat.chat_tools as chat_tools
+
+    cache = OrderedDict()
+    monkeypatch.setattr(chat_tools, "_sender_name_cache", cache)
+    monkeypatch.setattr(chat_tools, "_SENDER_CACHE_MAX_SIZE", 3)
+    return cache
+
+
+def test_cache_sender_evicts_least_recently_used(sender_cache):
+    from gchat.chat_tools import _cache_sender
+
+    for i in range(3):
+        _cache_sender(f"users/{i}", f"User {i}")
+    _cache_sender("users/3", "User 3")
+
+    assert list(sender_cache) == ["users/1", "users/2", "users/3"]
+
+
+@pytest.mark.asyncio
+async def test_resolve_sender_cache_hit_refreshes_recency(sender_cache):
+    from gchat.chat_tools import _cache_sender, _resolve_sender
+
+    for i in range(3):
+        _cache_sender(f"users/{i}", f"User {i}")
+
+    people_service = Mock()
+    assert await _resolve_sender(people_service, {"name": "users/0"}) == "User 0"
+    people_service.people.assert_not_called()
+
+    _cache_sender("users/3", "User 3")
+    assert list(sender_cache) == ["users/2", "users/0", "users/3"]
+
+
+@pytest.mark.asyncio
+async def test_concurrent_resolves_share_one_people_lookup(sender_cache, monkeypatch):
+    from gchat.chat_tools import _resolve_sender, _sender_inflight
+
+    async def slow_to_thread(fn, *args, **kwargs):
+        await asyncio.sleep(0.01)
+        return fn(*args, **kwargs)
+
+    monkeypatch.setattr("gchat.chat_tools._run_gapi", slow_to_thread)
+
+    people_service = Mock()
+    people_service.people().get().execute.return_value = {
+        "names": [{"displayName": "Ada"}]
+    }
+    people_service.people().get.reset_mock()
+
+    results = await asyncio.gather(
+        *(_resolve_sender(people_service, {"name": "users/7"}) for _ in range(3))
+    )
+
+    assert results == ["Ada", "Ada", "Ada"]
+    assert people_service.people().get.call_count == 1
+    assert _sender_inflight == {}
+
+
+def _batch_response(*entries):
+    """Build a people.getBatchGet response from (resource, person) pairs."""
+    return {
+        "responses": [
+            {"requestedResourceName": resource, "person": person}
+            for resource, person in entries
+        ]
+    }
+
+
+@pytest.mark.asyncio
+async def test_resolve_senders_batch_uses_one_batch_get(sender_cache):
+    from gchat.chat_tools import _cache_sender, _resolve_senders_batch
+
+    _cache_sender("users/cached", "Cached Name")
+    people_service = Mock()
+    people_service.people().getBatchGet().execute.return_value = _batch_response(
+        ("people/1", {"names": [{"displayName": "Ada"}]}),
+        ("people/2", {"emailAddresses": [{"value": "bob@example.com"}]}),
+    )
+    people_service.people().getBatchGet.reset_mock()
+
+    result = await _resolve_senders_batch(
+        people_service,
+        [
+            {"name": "users/1"},
+            {"name": "users/2"},
+            {"name": "users/3"},
+            {"name": "users/1"},
+            {"name": "users/named", "displayName": "Given"},
+            {"name": "users/cached"},
+            {},
+        ],
+    )
+
+    assert result == {
+        "users/1": "Ada",
+        "users/2": "bob@example.com",
+        "users/3": "users/3",
+        "users/named": "Given",
+        "users/cached": "Cached Name",
+    }
+    people_service.people().getBatchGet.assert_called_once_with(
+        resourceNames=["people/1", "people/2", "people/3"],
+        personFields="names,emailAddresses",
+    )
+    people_service.people().get.assert_not_called()
+
+
+@pytest.mark.asyncio
+async def test_resolve_senders_batch_chunks_requests(sender_cache, monkeypatch):
+    import gchat.chat_tools as chat_tools
+
+    monkeypatch.setattr(chat_tools, "_PEOPLE_BATCH_GET_MAX", 2)
+    monkeypatch.setattr(chat_tools, "_SENDER_CACHE_MAX_SIZE", 10)
+    people_service = Mock()
+    people_service.people().getBatchGet().execute.return_value = {"responses": []}
+    people_service.people().getBatchGet.reset_mock()
+
+    result = await chat_tools._resolve_senders_batch(
+        people_service, [{"name": f"users/{i}"} for i in range(5)]
+    )
+
+    assert result == {f"users/{i}": f"users/{i}" for i in range(5)}
+    batches = [
+        c.kwargs["resourceNames"]
+        for c in people_service.people().getBatchGet.call_args_list
+    ]
+    assert batches == [["people/0", "people/1"], ["people/2", "people/3"], ["people/4"]]
+
+
+@pytest.mark.asyncio
+async def test_resolve_senders_batch_falls_back_on_http_error(sender_cache):
+    from googleapiclient.errors import HttpError
+
+    from gchat.chat_tools import _resolve_senders_batch
+
+    resp = Mock()
+    resp.status = 403
+    people_service = Mock()
+    people_service.people().getBatchGet().execute.side_effect = HttpError(
+        resp=resp, content=b"forbidden"
+    )
+
+    result = await _resolve_senders_batch(people_service, [{"name": "users/1"}])
+
+    assert result == {"users/1": "users/1"}
+
+
+@pytest.mark.asyncio
+async def test_failed_lookup_expires_sooner_than_resolved_name(
+    sender_cache, monkeypatch
+):
+    import gchat.chat_tools as chat_tools
+
+    now = [1000.0]
+    monkeypatch.setattr(chat_tools.time, "monotonic", lambda: now[0])
+    people_service = Mock()
+    people_service.people().get().execute.side_effect = [
+        {},
+        {"names": [{"displayName": "Ada"}]},
+    ]
+    people_service.people().get.reset_mock()
+
+    async def resolve(user_id):
+        return await chat_tools._resolve_sender(people_service, {"name": user_id})
+
+    # An unresolvable sender is cached briefly as its raw ID
+    assert await resolve("users/1") == "users/1"
+    now[0] += chat_tools._SENDER_CACHE_NEGATIVE_TTL - 1
+    assert await resolve("users/1") == "users/1"
+    assert people_service.people().get.call_count == 1
+
+    # Once that expires the People API is asked again
+    now[0] += 2
+    assert await resolve("users/1") == "Ada"
+    assert people_service.people().get.call_count == 2
+
+    # Resolved names live for the full TTL
+    now[0] += chat_tools._SENDER_CACHE_TTL - 1
+    assert await resolve("users/1") == "Ada"
+    now[0] += 2
+    assert chat_tools._cached_sender_name("users/1") is None
+    assert "users/1" not in sender_cache
+
+
+@pytest.mark.parametrize(
+    "user_id,expected",
+    [
+        ("users/123", "people/123"),
+        ("users/abc/users/def", "people/abc/users/def"),
+        ("people/123", "people/123"),
+    ],
+)
+def test_people_resource_name(user_id, expected):
+    from gchat.chat_tools import _people_resource_name
+
+    assert _people_resource_name(user_id) == expected
+
+
+@pytest.mark.asyncio
+async def test_resolve_senders_batch_isolates_failed_shared_lookups(
+    sender_cache, monkeypatch
+):
+    import gchat.chat_tools as chat_tools
+
+    loop = asyncio.get_running_loop()
+    failing = loop.create_future()
+    succeeding = loop.create_future()
+    monkeypatch.setitem(chat_tools._sender_inflight, "users/bad", failing)
+    monkeypatch.setitem(chat_tools._sender_inflight, "users/good", succeeding)
+    loop.call_soon(failing.set_exception, RuntimeError("boom"))
+    loop.call_soon(succeeding.set_result, "Grace")
+
+    result = await chat_tools._resolve_senders_batch(
+        Mock(), [{"name": "users/bad"}, {"name": "users/good"}]
+    )
+
+    assert result == {"users/bad": "users/bad", "users/good": "Grace"}
+
+
+@pytest.mark.asyncio
+async def test_resolve_senders_batch_fallbacks_never_overlap(sender_cache, monkeypatch):
+    """Fallback lookups for cancelled shared lookups share one people_service."""
+    import gchat.chat_tools as chat_tools
+
+    in_flight = 0
+    peak = 0
+
+    async def tracking_run_gapi(fn, *args, **kwargs):
+        nonlocal in_flight, peak
+        in_flight += 1
+        peak = max(peak, in_flight)
+        await asyncio.sleep(0.01)
+        in_flight -= 1
+        return fn(*args, **kwargs)
+
+    monkeypatch.setattr(chat_tools, "_run_gapi", tracking_run_gapi)
+
+    loop = asyncio.get_running_loop()
+    user_ids = ["users/1", "users/2", "users/3"]
+    for user_id in user_ids:
+        owner = loop.create_future()
+        owner.cancel()
+        monkeypatch.setitem(chat_tools._sender_inflight, user_id, owner)
+
+    people_service = Mock()
+    people_service.people().get().execute.return_value = {
+        "names": [{"displayName": "Ada"}]
+    }
+
+    result = await chat_tools._resolve_senders_batch(
+        people_service, [{"name": user_id} for user_id in user_ids]
+    )
+
+    assert result == dict.fromkeys(user_ids, "Ada")
+    assert peak == 1
@@ -8,6 +8,7 @@ import pytest
 
 from gdocs import docs_tools
 from gdocs.docs_helpers import (
+    _normalize_color,
     build_text_style,
     create_named_range_request,
     create_replace_named_range_content_request,
@@ -45,6 +46,33 @@ class TestAdvancedTextStyle:
         assert "link" in fields
 
 
+class TestNormalizeColor:
+    def test_parses_hex_components(self):
+        assert _normalize_color("#FF8000", "text_color") == {
+            "red": 1.0,
+            "green": 128 / 255,
+            "blue": 0.0,
+        }
+
+    def test_accepts_lowercase_hex(self):
+        assert _normalize_color("#00ff00", "text_color")["green"] == 1.0
+
+    def test_cached_colors_return_independent_dicts(self):
+        first = _normalize_color("#123456", "text_color")
+        first["red"] = 99
+        assert _normalize_color("#123456", "text_color")["red"] == 0x12 / 255
+
+    def test_none_passes_through(self):
+        assert _normalize_color(None, "text_color") is None
+
+    @pytest.mark.parametrize(
+        "color", ["FF0000", "#FF00", "#GG0000", "#FF0000\n", "#FF00000", 0xFF0000]
+    )
+    def test_rejects_invalid_values(self, color):
+        with pytest.raises(ValueError, match="text_color must be a hex string"):
+            _normalize_color(color, "text_color")
+
+
 class TestAdvancedRequestBuilders:
     def test_named_range_request_uses_segment_and_tab(self):
         request = create_named_range_request(
@@ -173,6 +201,69 @@ class TestAdvancedValidation:
         assert not is_valid
         assert "column_count" in message
 
+    @pytest.mark.parametrize("color", ["#00ff7F", "#ABCDEF", None])
+    def test_color_param_accepts_hex(self, vm, color):
+        assert vm.validate_color_param(color, "text_color") == (True, "")
+
+    @pytest.mark.parametrize("color", ["#12345G", "123456", "#12345", 0xFFFFFF])
+    def test_color_param_rejects_invalid(self, vm, color):
+        is_valid, message = vm.validate_color_param(color, "text_color")
+        assert not is_valid
+        assert "text_color" in message
+
+    def test_document_id_accepts_drive_id_characters(self, vm):
+        assert vm.validate_document_id("1BxiMVs0XRA5nFMdKvBd-Zjgm_UqptlbsOgvE2up") == (
+            True,
+            "",
+        )
+
+    @pytest.mark.parametrize(
+        "document_id",
+        [
+            "https://docs.google.com/document/d/1BxiMVs0XRA5nFMdKvBdBZjgm/edit",
+            "1BxiMVs0XRA5nFMdKvBd BZjgm",
+        ],
+    )
+    def test_document_id_rejects_invalid_characters(self, vm, document_id):
+        is_valid, message = vm.validate_document_id(document_id)
+        assert not is_valid
+        assert "invalid characters" in message
+
+    def test_table_data_accepts_rectangular_strings(self, vm):
+        assert vm.validate_table_data([["a", "b"], ["c", ""]]) == (
+            True,
+            "Valid table data: 2×2 table format",
+        )
+
+    @pytest.mark.parametrize(
+        "table_data, expected",
+        [
+            ([["a"], "x", ["b"], 5], "Rows [1, 3] are not lists"),
+            ([["a"], [], ["b"], []], "Empty rows found at indices: [1, 3]"),
+            ([[], ["a"]], "Empty rows found at indices: [0]"),
+            ([["a", "b"], ["c"], ["d", "e"]], "Found column counts: [2, 1, 2]"),
+            ([["a"]] * 1001, "Too many rows (1001)"),
+            ([["a", None]], "Cell (0,1) is None"),
+        ],
+    )
+    def test_table_data_reports_first_failing_check(self, vm, table_data, expected):
+        is_valid, message = vm.validate_table_data(table_data)
+        assert not is_valid
+        assert expected in message
+
+    def test_validation_summary_is_independent_per_call(self, vm):
+        summary = vm.get_validation_summary()
+        summary["supported_operations"]["text_operations"] = ()
+        summary["constraints"]["table_max_rows"] = 1
+        fresh = vm.get_validation_summary()
+        assert "format_text" in fresh["supported_operations"]["text_operations"]
+        assert fresh["constraints"]["table_max_rows"] == 1000
+
+    def test_rules_are_shared_and_read_only(self, vm):
+        assert ValidationManager().validation_rules is vm.validation_rules
+        with pytest.raises(TypeError):
+            vm.validation_rules["table_max_rows"] = 1
+
 
 class TestAdvancedBatchManagerIntegration:
     @pytest.fixture()
@@ -235,6 +235,33 @@ class TestTextFormatting:
         assert "*italic*" in md
 
 
+class TestTextStyleEdgeCases:
+    @staticmethod
+    def _doc(*runs):
+        elements = [{"textRun": {"content": c, "textStyle": st}} for c, st in runs]
+        elements.append({"textRun": {"content": "\n", "textStyle": {}}})
+        return {
+            "title": "Styles",
+            "body": {"content": [{"paragraph": {"elements": elements}}]},
+        }
+
+    def test_monospace_font_becomes_inline_code(self):
+        md = convert_doc_to_markdown(
+            self._doc(("x = 1", {"weightedFontFamily": {"fontFamily": "Consolas"}}))
+        )
+        assert "`x = 1`" in md
+
+    def test_link_and_strikethrough_combine(self):
+        style = {"link": {"url": "https://example.com"}, "strikethrough": True}
+        md = convert_doc_to_markdown(self._doc(("gone", style)))
+        assert "[~~gone~~](https://example.com)" in md
+
+    def test_null_nested_style_fields_are_ignored(self):
+        style = {"link": None, "weightedFontFamily": None, "bold": True}
+        md = convert_doc_to_markdown(self._doc(("plain", style)))
+        assert md == "**plain**\n"
+
+
 class TestHeadings:
     def test_title(self):
         md = convert_doc_to_markdown(HEADINGS_DOC)
@@ -269,6 +296,40 @@ class TestLists:
         assert "- Item one" in md
         assert "- Item two" in md
 
+    def test_nesting_levels_classified_independently(self):
+        """Each nesting level of one list keeps its own ordered/unordered kind."""
+
+        def item(text, nesting):
+            return {
+                "paragraph": {
+                    "elements": [{"textRun": {"content": f"{text}\n"}}],
+                    "bullet": {"listId": "kix.mixed", "nestingLevel": nesting},
+                }
+            }
+
+        doc = {
+            "lists": {
+                "kix.mixed": {
+                    "listProperties": {
+                        "nestingLevels": [
+                            {"glyphType": "DECIMAL"},
+                            {"glyphSymbol": "-"},
+                        ]
+                    }
+                }
+            },
+            "body": {
+                "content": [
+                    item("First", 0),
+                    item("Child", 1),
+                    item("Second", 0),
+                    item("Child two", 1),
+                ]
+            },
+        }
+        md = convert_doc_to_markdown(doc)
+        assert md == "1. First\n  - Child\n2. Second\n  - Child two\n"
+
 
 CHECKLIST_DOC = {
     "title": "Checklist Test",
@@ -1082,6 +1143,29 @@ class TestInlineComments:
         assert "## Comments" in result
         assert "> missing" in result
 
+    def test_multiple_anchors_and_shared_anchor(self):
+        md = "Alpha beta gamma.\n"
+
+        def comment(anchor, content):
+            return {
+                "author": "Alice",
+                "content": content,
+                "anchor_text": anchor,
+                "replies": [],
+                "resolved": False,
+            }
+
+        result = format_comments_inline(
+            md,
+            [
+                comment("gamma", "one"),
+                comment("Alpha", "two"),
+                comment("gamma", "three"),
+            ],
+        )
+        assert result.startswith("Alpha[^c2] beta gamma[^c1][^c3].\n")
+        assert "[^c3]: **Alice**: three" in result
+
 
 class TestAppendixComments:
     def test_structure(self):
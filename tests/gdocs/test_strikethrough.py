@@ -74,6 +74,13 @@ class TestCreateFormatTextRequestStrikethrough:
         inner = result["updateTextStyle"]
         assert inner["range"]["tabId"] == "t.abc"
 
+    def test_no_styles_returns_none(self):
+        assert create_format_text_request(1, 10) is None
+
+    def test_false_strikethrough_is_still_applied(self):
+        result = create_format_text_request(1, 10, strikethrough=False)
+        assert result["updateTextStyle"]["textStyle"] == {"strikethrough": False}
+
 
 class TestValidateTextFormattingStrikethrough:
     @pytest.fixture()
@@ -1,6 +1,7 @@
 import base64
 import os
 import sys
+from datetime import datetime
 
 import pytest
 
@@ -99,3 +100,210 @@ def test_save_attachment_preserves_various_binary_formats(isolated_storage, payl
         saved_bytes = f.read()
 
     assert saved_bytes == payload
+
+
+def test_get_attachment_metadata_returns_detached_dict(isolated_storage):
+    """Metadata is exposed as a plain dict that does not alias the stored record."""
+    b64_data = base64.urlsafe_b64encode(b"hello").decode()
+    result = isolated_storage.save_attachment(
+        b64_data, filename="note.txt", mime_type="text/plain"
+    )
+
+    metadata = isolated_storage.get_attachment_metadata(result.file_id)
+    assert metadata["filename"] == "note.txt"
+    assert metadata["mime_type"] == "text/plain"
+    assert metadata["size"] == 5
+    assert metadata["file_path"] == result.path
+    assert set(metadata) == {
+        "file_path",
+        "filename",
+        "mime_type",
+        "size",
+        "created_at",
+        "expires_at",
+    }
+    assert isinstance(metadata["expires_at"], datetime)
+    assert (metadata["expires_at"] - metadata["created_at"]).total_seconds() == (
+        isolated_storage.expiration_seconds
+    )
+
+    metadata["filename"] = "changed.txt"
+    again = isolated_storage.get_attachment_metadata(result.file_id)
+    assert again["filename"] == "note.txt"
+
+
+def test_cleanup_expired_only_removes_expired_entries(isolated_storage):
+    """cleanup_expired removes expired files and leaves live ones untouched."""
+    b64_data = base64.urlsafe_b64encode(b"payload").decode()
+    live = isolated_storage.save_attachment(b64_data, filename="live.bin")
+
+    isolated_storage.expiration_seconds = -1
+    expired = isolated_storage.save_attachment(b64_data, filename="old.bin")
+
+    assert isolated_storage.cleanup_expired() == 1
+    assert not os.path.exists(expired.path)
+    assert os.path.exists(live.path)
+    assert isolated_storage.get_attachment_metadata(live.file_id) is not None
+    assert isolated_storage.cleanup_expired() == 0
+
+
+@pytest.mark.parametrize("size", [0, 1, 3 * 64 * 1024 + 7])
+def test_save_attachment_streams_large_payloads(isolated_storage, size):
+    """Payloads spanning several decode chunks round-trip byte-for-byte."""
+    payload = os.urandom(size)
+    b64_data = base64.urlsafe_b64encode(payload).decode()
+
+    result = isolated_storage.save_attachment(b64_data, filename="big.bin")
+
+    with open(result.path, "rb") as f:
+        assert f.read() == payload
+    assert isolated_storage.get_attachment_metadata(result.file_id)["size"] == size
+
+
+def test_save_attachment_accepts_line_wrapped_base64(isolated_storage):
+    """MIME-style line breaks that straddle chunk boundaries still decode."""
+    payload = os.urandom(200 * 1024)
+    b64 = base64.urlsafe_b64encode(payload).decode()
+    wrapped = "\r\n".join(b64[i : i + 76] for i in range(0, len(b64), 76))
+
+    result = isolated_storage.save_attachment(wrapped, filename="wrapped.bin")
+
+    with open(result.path, "rb") as f:
+        assert f.read() == payload
+
+
+def test_save_attachment_rejects_invalid_base64(isolated_storage, tmp_path):
+    """Invalid data raises ValueError and leaves no partial file behind."""
+    with pytest.raises(ValueError, match="Invalid base64 data"):
+        isolated_storage.save_attachment("QUJDR", filename="bad.bin")
+
+    assert list(tmp_path.iterdir()) == []
+
+
+@pytest.mark.parametrize("size", [8, 256 * 1024])
+def test_save_attachment_rejects_non_ascii_base64(isolated_storage, tmp_path, size):
+    """Non-ASCII str input, small or chunk-decoded, leaves no partial file."""
+    import core.attachment_storage as storage_module
+
+    valid = base64.urlsafe_b64encode(b"x" * size).decode()
+    bad = valid[: storage_module._DECODE_CHUNK_CHARS] + "é" + valid[-4:]
+    with pytest.raises(ValueError, match="Invalid base64 data"):
+        isolated_storage.save_attachment(bad, filename="bad.bin")
+
+    assert list(tmp_path.iterdir()) == []
+
+
+def test_concurrent_saves_and_cleanup_keep_metadata_consistent(isolated_storage):
+    """Saves racing with cleanup sweeps must not lose or corrupt records."""
+    from concurrent.futures import ThreadPoolExecutor
+
+    b64_data = base64.urlsafe_b64encode(b"x" * 64).decode()
+
+    def save(i):
+        if i % 10 == 0:
+            isolated_storage.cleanup_expired()
+        return isolated_storage.save_attachment(b64_data, filename=f"f{i}.bin")
+
+    with ThreadPoolExecutor(max_workers=8) as pool:
+        results = list(pool.map(save, range(100)))
+
+    assert len({r.file_id for r in results}) == 100
+    for r in results:
+        assert isolated_storage.get_attachment_path(r.file_id) is not None
+
+
+def test_save_attachment_strips_directories_from_filename(isolated_storage, tmp_path):
+    """Only the base name of a supplied filename is used on disk."""
+    b64_data = base64.urlsafe_b64encode(b"data").decode()
+    result = isolated_storage.save_attachment(b64_data, filename="../../etc/report.pdf")
+
+    assert os.path.dirname(result.path) == str(tmp_path)
+    name = os.path.basename(result.path)
+    assert name.startswith("report_") and name.endswith(".pdf")
+
+
+def test_save_attachment_recreates_removed_storage_dir(tmp_path, monkeypatch):
+    """A storage dir deleted after first use is re-created by the next save."""
+    import shutil
+
+    import core.attachment_storage as storage_module
+
+    storage_dir = tmp_path / "attachments"
+    monkeypatch.setattr(storage_module, "STORAGE_DIR", storage_dir)
+    storage = storage_module.AttachmentStorage()
+    b64_data = base64.urlsafe_b64encode(b"data").decode()
+
+    storage.save_attachment(b64_data, filename="a.bin")
+    shutil.rmtree(storage_dir)
+
+    result = storage.save_attachment(b64_data, filename="b.bin")
+    assert os.path.exists(result.path)
+
+    shutil.rmtree(storage_dir)
+    fd, temp_path = storage.create_temp_file()
+    os.close(fd)
+    assert os.path.dirname(temp_path) == str(storage_dir)
+
+
+def test_cleanup_tolerates_already_deleted_file(isolated_storage):
+    """Expired records whose file is already gone are still dropped quietly."""
+    b64_data = base64.urlsafe_b64encode(b"data").decode()
+    isolated_storage.expiration_seconds = -1
+    result = isolated_storage.save_attachment(b64_data, filename="gone.bin")
+    os.unlink(result.path)
+
+    assert isolated_storage.cleanup_expired() == 1
+    assert isolated_storage.get_attachment_metadata(result.file_id) is None
+
+
+def test_save_attachment_handles_short_writes(isolated_storage, monkeypatch):
+    """Partial os.write results are retried until the payload is complete."""
+    import core.attachment_storage as storage_module
+
+    real_write = os.write
+    monkeypatch.setattr(
+        storage_module.os, "write", lambda fd, data: real_write(fd, bytes(data[:7]))
+    )
+    payload = bytes(range(256))
+    b64_data = base64.urlsafe_b64encode(payload).decode()
+
+    result = isolated_storage.save_attachment(b64_data, filename="short.bin")
+
+    with open(result.path, "rb") as f:
+        assert f.read() == payload
+
+
+def test_save_attachment_from_path_moves_temp_file(isolated_storage, tmp_path):
+    """A streamed temp file is moved into storage and registered as-is."""
+    payload = bytes(range(256)) * 4
+    fd, temp_path = isolated_storage.create_temp_file()
+    with os.fdopen(fd, "wb") as f:
+        f.write(payload)
+
+    result = isolated_storage.save_attachment_from_path(
+        temp_path, filename="report.pdf", mime_type="application/pdf"
+    )
+
+    assert not os.path.exists(temp_path)
+    assert os.path.dirname(result.path) == str(tmp_path)
+    assert result.path.endswith(".pdf")
+    assert (os.stat(result.path).st_mode & 0o777) == 0o600
+    with open(result.path, "rb") as f:
+        assert f.read() == payload
+    metadata = isolated_storage.get_attachment_metadata(result.file_id)
+    assert metadata["size"] == len(payload)
+    assert metadata["filename"] == "report.pdf"
+
+
+def test_save_attachment_bytes_writes_raw_payload(isolated_storage):
+    payload = b"%PDF-1.7\n" + bytes(range(256))
+
+    result = isolated_storage.save_attachment_bytes(
+        payload, filename="doc.pdf", mime_type="application/pdf"
+    )
+
+    with open(result.path, "rb") as f:
+        assert f.read() == payload
+    metadata = isolated_storage.get_attachment_metadata(result.file_id)
+    assert metadata["size"] == len(payload)
+    assert metadata["mime_type"] == "application/pdf"
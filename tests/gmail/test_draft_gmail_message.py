@@ -569,16 +569,18 @@ def test_try_read_local_attachment_reads_from_storage(tmp_path, monkeypatch):
     monkeypatch.setattr(storage_mod, "_attachment_storage", storage)
 
     # Manually register metadata so get_attachment_path works.
+    import time
     from datetime import datetime, timedelta
 
-    storage._metadata[file_id] = {
-        "file_path": str(tmp_path / f"report_{file_id[:8]}.pdf"),
-        "filename": "report.pdf",
-        "mime_type": "application/pdf",
-        "size": 9,
-        "created_at": datetime.now(),
-        "expires_at": datetime.now() + timedelta(hours=1),
-    }
+    storage._metadata[file_id] = storage_mod.AttachmentRecord(
+        file_path=str(tmp_path / f"report_{file_id[:8]}.pdf"),
+        filename="report.pdf",
+        mime_type="application/pdf",
+        size=9,
+        created_at=datetime.now(),
+        expires_at=datetime.now() + timedelta(hours=1),
+        deadline=time.monotonic() + 3600,
+    )
 
     result = _try_read_local_attachment(f"/attachments/{file_id}")
     assert result is not None
@@ -9,6 +9,8 @@ export_doc_to_pdf, and list_spreadsheets — without requiring --tools drive.
 import sys
 import os
 
+import pytest
+
 sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
 
 from auth.scopes import (
@@ -30,6 +32,7 @@ from auth.scopes import (
     SHEETS_WRITE_SCOPE,
     get_scopes_for_tools,
     has_required_scopes,
+    is_read_only_mode,
     set_read_only,
 )
 from auth.permissions import get_scopes_for_permission, set_permissions
@@ -87,10 +90,11 @@ class TestReadOnlyScopes:
     """Tests for read-only mode scope generation."""
 
     def setup_method(self):
+        self._previous_read_only = is_read_only_mode()
         set_read_only(False)
 
     def teardown_method(self):
-        set_read_only(False)
+        set_read_only(self._previous_read_only)
 
     def test_docs_readonly_includes_drive_readonly(self):
         """Even in read-only mode, docs needs drive.readonly for search/list."""
@@ -110,6 +114,20 @@ class TestReadOnlyScopes:
         scopes = get_scopes_for_tools(["sheets"])
         assert DRIVE_READONLY_SCOPE in scopes
 
+    def test_toggling_read_only_is_not_served_from_stale_cache(self):
+        """Cached scope sets must follow the current read-only mode."""
+        assert DRIVE_FILE_SCOPE in get_scopes_for_tools(["docs"])
+        set_read_only(True)
+        assert DRIVE_FILE_SCOPE not in get_scopes_for_tools(["docs"])
+        set_read_only(False)
+        assert DRIVE_FILE_SCOPE in get_scopes_for_tools(["docs"])
+
+    def test_returned_list_does_not_alias_cache(self):
+        """Mutating a returned scope list must not affect later calls."""
+        scopes = get_scopes_for_tools(["docs"])
+        scopes.clear()
+        assert DRIVE_READONLY_SCOPE in get_scopes_for_tools(["docs"])
+
 
 class TestHasRequiredScopes:
     """Tests for hierarchy-aware scope checking."""
@@ -199,6 +217,17 @@ class TestHasRequiredScopes:
         required = [GMAIL_READONLY_SCOPE, DRIVE_READONLY_SCOPE]
         assert not has_required_scopes(available, required)
 
+    def test_generator_required_is_fully_checked(self):
+        """A one-shot iterable of required scopes is not consumed by the fast path."""
+        available = [GMAIL_MODIFY_SCOPE]
+        # The missing scope comes first, so a partial fast-path pass consumes it
+        required = (s for s in [DRIVE_READONLY_SCOPE, GMAIL_READONLY_SCOPE])
+        assert not has_required_scopes(available, required)
+
+    def test_generator_required_uses_hierarchy(self):
+        required = (s for s in [GMAIL_READONLY_SCOPE, GMAIL_SEND_SCOPE])
+        assert has_required_scopes([GMAIL_MODIFY_SCOPE], required)
+
 
 class TestGranularPermissionsScopes:
     """Tests for granular permissions scope generation path."""
@@ -229,3 +258,27 @@ class TestGranularPermissionsScopes:
         with_permissions = get_scopes_for_tools(["drive"])
         assert GMAIL_READONLY_SCOPE in with_permissions
         assert DRIVE_READONLY_SCOPE not in with_permissions
+
+
+class TestLazyScopesAttribute:
+    """SCOPES is resolved on access so it tracks the current configuration."""
+
+    def setup_method(self):
+        self._previous_read_only = is_read_only_mode()
+        set_read_only(False)
+
+    def teardown_method(self):
+        set_read_only(self._previous_read_only)
+
+    def test_scopes_follows_read_only_mode(self):
+        import auth.scopes as scopes_module
+
+        assert DRIVE_FILE_SCOPE in scopes_module.SCOPES
+        set_read_only(True)
+        assert DRIVE_FILE_SCOPE not in scopes_module.SCOPES
+
+    def test_unknown_attribute_still_raises(self):
+        import auth.scopes as scopes_module
+
+        with pytest.raises(AttributeError):
+            getattr(scopes_module, "NOT_A_SCOPE")